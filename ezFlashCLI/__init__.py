@@ -19,18 +19,28 @@
 # DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
 # OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
 # OR OTHER DEALINGS IN THE SOFTWARE.
+import os
+import shutil
 import subprocess
 from importlib import metadata
 
+VERSION_FILE_PATH = os.path.join(os.path.dirname(__file__), "version.txt")
+
 
 def get_version_from_git():
     """Generate the version string from git describe."""
     # grab the version from git describe
+    # the absolute executable path and close_fds=False allow subprocess to use
+    # posix_spawn (vfork like) instead of fork, which cost grows with the RSS
+    git = shutil.which("git") or "git"
     version = (
-        subprocess.check_output(
-            ["git", "describe", "--always", "--long", "--dirty", "--tags"]
+        subprocess.run(
+            [git, "describe", "--always", "--long", "--dirty", "--tags"],
+            stdout=subprocess.PIPE,
+            check=True,
+            close_fds=False,
         )
-        .strip()
+        .stdout.strip()
         .decode("utf-8")[1:]
     )
     # process the string to be PEP 440 compliant
@@ -39,11 +49,31 @@ def get_version_from_git():
     return version
 
 
+def write_version_file(version, path=VERSION_FILE_PATH):
+    """Store the version string so it does not need to be resolved at runtime.
+
+    Args:
+        version: version string
+        path: destination file, the build output copy of version.txt
+    """
+    with open(path, "w") as version_file:
+        version_file.write(version)
+
+
 try:
-    __version__ = metadata.version("ezFlashCLI")
-except Exception:
+    # version.txt is generated at build time, reading it is much cheaper
+    # than scanning the installed distributions metadata
+    with open(VERSION_FILE_PATH) as version_file:
+        __version__ = version_file.read().strip()
+except OSError:
+    __version__ = None
+
+if not __version__:
     try:
-        # try to get the version from git
-        __version__ = get_version_from_git()
+        __version__ = metadata.version("ezFlashCLI")
     except Exception:
-        __version__ = "unkown-requires-git"
+        try:
+            # try to get the version from git
+            __version__ = get_version_from_git()
+        except Exception:
+            __version__ = "unkown-requires-git"
@@ -23,35 +23,74 @@
 
 
 import argparse
-import json
+import contextlib
+import functools
 import logging
+import mmap
 import os
 import sys
+from operator import attrgetter
 
-import ezFlashCLI.ezFlash.smartbond.smartbondDevices as sbdev
 from ezFlashCLI import __version__
-from ezFlashCLI.ezFlash.pyjlink import pyjlink
+from ezFlashCLI.flashDatabase import load_flash_database
+
+
+def auto_int(value):
+    """Convert a decimal or prefixed (0x, 0o, 0b) command line integer.
+
+    Args:
+        value: integer string
+    """
+    return int(value, 0)
+
+
+def data_bytes(value):
+    """Convert a decimal (0-255) or hexadecimal (0x00-0xFF...) data string.
+
+    Args:
+        value: decimal byte or hexadecimal byte sequence string
+
+    Returns:
+        The decoded bytes
+
+    Raises:
+        ValueError: the string is not a byte value or an hexadecimal sequence
+    """
+    if value.startswith("0x"):
+        data = bytes.fromhex(value[2:])
+        if not data:
+            raise ValueError("empty hexadecimal value")
+        return data
+
+    byte = int(value)
+    if not 0 <= byte <= 0xFF:
+        raise ValueError("decimal value out of the 0-255 range")
+    return bytes((byte,))
 
 
 class ezFlashCLI:
     """Command line interpreter class."""
 
+    # bytes read from the target and written to disk at once by the dump ops
+    DUMP_CHUNK_SIZE = 0x10000
+
+    deviceType = None
     flashid = None
+    flash_probed = False
 
     def __init__(self):
         """Initialize the class and parse command line arguments."""
         # parse the command line arguments
         self.argument_parser()
 
-        # load the flash database
-        with open(
-            os.path.join(
-                os.path.dirname(os.path.abspath(__file__)), "flash_database.json"
-            )
-        ) as json_file:
-            self.flash_db = json.load(json_file)
+        # nothing else is needed to report the version or the help
+        if self.args.version:
+            print(__version__)
+            sys.exit(0)
 
-            json_file.close()
+        if self.args.operation is None:
+            self.parser.print_help(sys.stderr)
+            sys.exit(0)
 
         # set the verbosity
         if self.args.verbose:
@@ -59,21 +98,19 @@ class ezFlashCLI:
         else:
             logging.basicConfig(level=logging.INFO)
 
-        logging.info("{} v{}".format(self.__class__.__name__, __version__))
+        logging.info("%s v%s", self.__class__.__name__, __version__)
         logging.info("By using the program you accept the SEGGER J-link™ license")
 
-        # list the jlink interfaces
-        if self.args.version:
-            logging.info("{}".format(__version__))
-            sys.exit(0)
-
         # using JLINK for operations
         if not self.args.port:
+            from ezFlashCLI.ezFlash.pyjlink import pyjlink
+
             self.link = pyjlink()
             self.link.init()
             if self.args.host:
                 self.link.iphost = self.args.host
-            else:
+            elif not self.args.jlink or self.args.operation == "list":
+                # an interface given with -j is selected by its serial number
                 self.rawdevicelist = self.link.browse()
                 if self.rawdevicelist is None:
                     logging.error("No JLink device found")
@@ -89,18 +126,19 @@ class ezFlashCLI:
                             "99-jlink.rules",
                         )
                         logging.info(
-                            "This may be caused by missing udev rules, run this command to add them: sudo cp {} /etc/udev/rules.d/".format(
-                                rulefile
-                            )
+                            "This may be caused by missing udev rules, run this command to add them: sudo cp %s /etc/udev/rules.d/",
+                            rulefile,
                         )
                         sys.exit(1)
 
-                self.devicelist = []
-                for device in self.rawdevicelist:
-                    if device.SerialNumber != 0:
-                        self.devicelist.append(device)
-
-                self.devicelist.sort()
+                self.devicelist = sorted(
+                    (
+                        device
+                        for device in self.rawdevicelist
+                        if device.SerialNumber != 0
+                    ),
+                    key=attrgetter("SerialNumber"),
+                )
                 if (
                     len(self.devicelist) > 1
                     and not self.args.jlink
@@ -113,129 +151,107 @@ class ezFlashCLI:
                     self.display_jlink_devices()
 
                     logging.warning(
-                        "Selecting interface {}".format(self.devicelist[0].SerialNumber)
+                        "Selecting interface %s", self.devicelist[0].SerialNumber
                     )
                     self.args.jlink = self.devicelist[0].SerialNumber
 
-        # list the jlink interfaces
-        if self.args.operation == "list":
-            if self.link.iphost is None:
-                self.display_jlink_devices()
-            else:
-                logging.info("Do not use command list with --host option")
+        self.args.func()
+        sys.exit(0)
 
-        elif self.args.operation == "probe":
-            self.probeDevice()
+    def op_list(self):
+        """List the JLink interfaces."""
+        if self.link.iphost is None:
+            self.display_jlink_devices()
+        else:
+            logging.info("Do not use command list with --host option")
 
-            logging.info("Smartbond chip: {}".format(self.deviceType.pretty_identifier))
+    def op_probe(self):
+        """Perform chip detection and its associated flash."""
+        self.probeDevice()
 
-            self.probeFlash()
-            logging.info("Flash information:")
-            if self.flashid is not None:
-                logging.info("  - Device Id: {}".format(self.flashid["name"]))
-            else:
-                logging.info("  - Device Id: {}".format("Not Found"))
+        logging.info("Smartbond chip: %s", self.deviceType.pretty_identifier)
 
-            # # check the flash header
-            # if self.flashid:
-            #     print("  - Product header programmed: {}".format(self.flashProductHeaderIsCorrect()))
+        self.probeFlash()
+        logging.info("Flash information:")
+        if self.flashid is not None:
+            logging.info("  - Device Id: %s", self.flashid["name"])
+        else:
+            logging.info("  - Device Id: Not Found")
 
-        elif self.args.operation == "go":
-            self.probeDevice()
-            logging.info("Smartbond chip: {}".format(self.deviceType.pretty_identifier))
-            self.importAndAssignDevice(self.deviceType.identifier)
-            self.da.connect(self.args.jlink)
-            self.da.go()
+    def op_go(self):
+        """Reset and start the CPU."""
+        self.probeDevice()
+        logging.info("Smartbond chip: %s", self.deviceType.pretty_identifier)
+        self.importAndAssignDevice(self.deviceType.identifier)
+        self.da.connect(self.args.jlink)
+        self.da.go()
 
-        elif self.args.operation == "erase_flash":
-            self.probeDevice()
-            self.probeFlash()
+    def op_erase_flash(self):
+        """Perform chip erase on the SPI/QSPI flash."""
+        self.probeDevice()
+        self.probeFlash()
 
-            if self.flashid is None:
-                logging.info("Flash chip not found")
-                sys.exit(1)
+        if self.flashid is None:
+            logging.info("Flash chip not found")
+            sys.exit(1)
 
-            if self.da.flash_erase():
-                logging.info("Flash erase success")
-            else:
-                logging.error("Flash erase failed")
-                sys.exit(1)
+        if self.da.flash_erase():
+            logging.info("Flash erase success")
+        else:
+            logging.error("Flash erase failed")
+            sys.exit(1)
 
-        elif self.args.operation == "read_flash":
+    def op_read_flash(self):
+        """Read data at the specified address and length."""
+        self.probeDevice()
+        self.probeFlash()
+        self.da.flash_configure_controller(self.flashid)
+        data = self.da.read_flash(self.args.addr, self.args.length)
+        self.display_hex_dump(self.args.addr, data)
+
+    def op_read_flash_bin(self):
+        """Read flash and output to file."""
+        with open(self.args.file, "wb") as fp:
             self.probeDevice()
             self.probeFlash()
             self.da.flash_configure_controller(self.flashid)
-            data = self.da.read_flash(self.args.addr, self.args.length)
-            current_address = self.args.addr
-            line_width = 16
-            while len(data):
-                dataByes = " ".join("{:02x}".format(x) for x in data[:line_width])
-                logging.info("{:08X}: {}".format(current_address, dataByes))
-                data = data[line_width:]
-                current_address += line_width
-        elif self.args.operation == "read_flash_bin":
-            with open(self.args.file, "wb") as fp:
-                self.probeDevice()
-                self.probeFlash()
-                self.da.flash_configure_controller(self.flashid)
-                data = self.da.read_flash(self.args.addr, self.args.length)
-                for datum in data:
-                    fp.write(datum.to_bytes(1, "little"))
-                fp.close()
-
-        elif self.args.operation == "write_flash_bytes":
-            # decode the command
-            logging.info(
-                "Writing at 0x{:08x}. Data: {}".format(self.args.addr, self.args.data)
-            )
-            # decode the data
-            data = b""
-
-            for d in self.args.data:
-                if "0x" in d:
-                    try:
-                        data += bytes().fromhex(d[2:])
-                    except Exception as ex:
-                        logging.error("Failed to decode byte: {}: {}".format(d, ex))
-                        sys.exit(0)
-                else:
-                    data += int(d).to_bytes(1, "little")
-
-            self.probeDevice()
-            self.probeFlash()
-            if self.flashid is None:
-                logging.info("Flash chip not found")
-                sys.exit(1)
-
-            self.importAndAssignDevice(self.deviceType.identifier)
-            self.da.connect(self.args.jlink)
-            if self.da.flash_program_data(data, self.args.addr):
-                logging.info("Flash write success")
-            else:
-                logging.error("Flash write failed")
+            self.dump_to_file(fp, self.da.read_flash, self.args.addr, self.args.length)
+
+    def op_write_flash_bytes(self):
+        """Write arbitrary data at the specified address."""
+        # decode the command
+        logging.info("Writing at 0x%08x. Data: %s", self.args.addr, self.args.data)
+        # decode the data
+        data = self.decode_data_bytes(self.args.data)
+
+        self.probeDevice()
+        self.probeFlash()
+        if self.flashid is None:
+            logging.info("Flash chip not found")
+            sys.exit(1)
 
+        if self.da.flash_program_data(data, self.args.addr):
+            logging.info("Flash write success")
+        else:
+            logging.error("Flash write failed")
             sys.exit(1)
 
-        elif self.args.operation == "write_flash":
-            try:
-                fp = open(self.args.filename, "rb")
-            except Exception as ex:
-                logging.error(
-                    "Failed to open {}. Err: {}".format(self.args.filename, ex)
-                )
-                sys.exit(1)
+    def op_write_flash(self):
+        """Write binary file at the specified address."""
+        try:
+            fp = open(self.args.filename, "rb")
+        except Exception as ex:
+            logging.error("Failed to open %s. Err: %s", self.args.filename, ex)
+            sys.exit(1)
 
-            self.probeDevice()
-            self.probeFlash()
-            if self.flashid is None:
-                logging.info("Flash chip not found")
-                sys.exit(1)
+        self.probeDevice()
+        self.probeFlash()
+        if self.flashid is None:
+            logging.info("Flash chip not found")
+            sys.exit(1)
 
-            self.importAndAssignDevice(self.deviceType.identifier)
-            self.da.connect(self.args.jlink)
-            fileData = fp.read()
-            logging.info("Program file size {}".format(len(fileData)))
-            fp.close()
+        with fp, self.map_file(fp) as fileData:
+            logging.info("Program file size %s", len(fileData))
 
             if self.da.flash_program_data(fileData, self.args.addr):
                 logging.info("Flash write success")
@@ -243,164 +259,167 @@ class ezFlashCLI:
                 logging.error("Flash write failed")
                 sys.exit(1)
 
-        elif self.args.operation == "image_flash":
-            try:
-                fp = open(self.args.filename, "rb")
-            except Exception as ex:
-                logging.error(
-                    "Failed to open {}. Err:{}".format(self.args.filename, ex)
-                )
-                sys.exit(1)
+    def op_image_flash(self):
+        """Write the flash binary."""
+        try:
+            fp = open(self.args.filename, "rb")
+        except Exception as ex:
+            logging.error("Failed to open %s. Err:%s", self.args.filename, ex)
+            sys.exit(1)
 
-            parameters = {}
-            parameters["active_fw_image_address"] = self.args.active_image_address
-            self.probeDevice()
-            self.probeFlash()
-            if self.flashid is None:
-                logging.info("Flash chip not found")
-                sys.exit(1)
-            parameters["flashid"] = self.flashid
+        parameters = {}
+        parameters["active_fw_image_address"] = self.args.active_image_address
+        self.probeDevice()
+        self.probeFlash()
+        if self.flashid is None:
+            logging.info("Flash chip not found")
+            sys.exit(1)
+        parameters["flashid"] = self.flashid
 
-            self.importAndAssignDevice(self.deviceType.identifier)
-            self.da.connect(self.args.jlink)
-            fileData = fp.read()
-            fp.close()
+        with fp, self.map_file(fp) as fileData:
             if self.da.flash_program_image(fileData, parameters):
                 logging.info("Flash image success")
             else:
                 logging.error("Flash image failed")
                 sys.exit(1)
 
-        elif self.args.operation == "image_bootloader_flash":
-            try:
-                fp = open(self.args.filename, "rb")
-            except Exception as ex:
-                logging.error(
-                    "Failed to open {}. Err:{}".format(self.args.filename, ex)
-                )
-                sys.exit(1)
+    def op_image_bootloader_flash(self):
+        """Write an image to flash and add the bootloader."""
+        try:
+            fp = open(self.args.filename, "rb")
+        except Exception as ex:
+            logging.error("Failed to open %s. Err:%s", self.args.filename, ex)
+            sys.exit(1)
 
-            parameters = {}
-            self.probeDevice()
-            self.probeFlash()
-            if self.flashid is None:
-                logging.info("Flash chip not found")
-                sys.exit(1)
-            parameters["flashid"] = self.flashid
+        parameters = {}
+        self.probeDevice()
+        self.probeFlash()
+        if self.flashid is None:
+            logging.info("Flash chip not found")
+            sys.exit(1)
+        parameters["flashid"] = self.flashid
 
-            self.importAndAssignDevice(self.deviceType.identifier)
-            self.da.connect(self.args.jlink)
-            parameters["fileData"] = fp.read()
-            fp.close()
+        with fp, self.map_file(fp) as parameters["fileData"]:
             if self.da.flash_program_image_with_bootloader(parameters):
                 logging.info("Flash image success")
             else:
                 logging.error("Flash image failed")
                 sys.exit(1)
 
-        elif self.args.operation == "linker_header":
-            """Generate the product header based on the probed flash
-
-            This can be pasted in your linker script to adapt custom flash
-
-            """
-            self.probeDevice()
-            self.probeFlash()
-            self.importAndAssignDevice(self.deviceType.identifier)
+    def op_linker_header(self):
+        """Generate the product header based on the probed flash.
 
-            logging.info(
-                self.da.scatterfile_product_header(
-                    self.flashid["flash_burstcmda_reg_value"],
-                    self.flashid["flash_burstcmdb_reg_value"],
-                    self.flashid["flash_write_config_command"],
-                )
+        This can be pasted in your linker script to adapt custom flash
+        """
+        self.probeDevice()
+        self.probeFlash()
+
+        logging.info(
+            self.da.scatterfile_product_header(
+                self.flashid["flash_burstcmda_reg_value"],
+                self.flashid["flash_burstcmdb_reg_value"],
+                self.flashid["flash_write_config_command"],
             )
+        )
 
-        elif self.args.operation == "product_header_check":
-            """Performs sanity check on the product header
-            it will verify the content is consistent with the probed flash
+    def op_product_header_check(self):
+        """Perform sanity check on the product header.
 
-            Args:
-                None
+        It will verify the content is consistent with the probed flash
+        """
+        self.probeDevice()
+        self.probeFlash()
 
-            Returns:
-                True if the Header is consistent with the attached flash
+        productHeaderCalculated = self.calculateProductHeader()
 
-            """
+        self.da.flash_configure_controller(self.flashid)
+        productHeader = self.da.read_product_header()
 
-            self.probeDevice()
-            self.probeFlash()
-            self.importAndAssignDevice(self.deviceType.identifier)
+        if productHeaderCalculated == productHeader:
+            logging.info("Product header OK")
+        else:
+            logging.error("Product header mismatch")
+
+    def op_read_otp(self):
+        """Read the specified OTP config script value."""
+        self.probeDevice()
+        self.probeFlash()
+        count, offset = self.da.otp_read(self.args.key)
+        if offset < 0:
+            sys.exit(1)
 
-            productHeaderCalculated = self.calculateProductHeader()
+    def op_write_otp(self):
+        """Write the specified OTP config script value."""
+        self.probeDevice()
+        self.probeFlash()
+        result = self.da.otp_write(self.args.key, self.args.values, self.args.force)
+        if result < 0:
+            sys.exit(1)
 
-            self.da.connect(self.args.jlink)
-            self.da.flash_configure_controller(self.flashid)
-            productHeader = self.da.read_product_header()
+    def op_otp_blank_check(self):
+        """Check if the OTP is blank."""
+        self.probeDevice()
+        self.probeFlash()
+        if self.da.otp_blank_check() is True:
+            logging.info("OTP is blank")
+            sys.exit(0)
+        else:
+            logging.info("OTP is NOT blank")
+            sys.exit(1)
 
-            if productHeaderCalculated == productHeader:
-                logging.info("Product header OK")
-            else:
-                logging.error("Product header mismatch")
+    def op_read_otp_hex(self):
+        """Read OTP data at the specified address and length."""
+        self.probeDevice()
+        self.probeFlash()
+        data = self.da.otp_read_raw(self.args.addr, self.args.length)
+        self.display_hex_dump(self.args.addr, data)
 
-        elif self.args.operation == "read_otp":
+    def op_read_otp_bin(self):
+        """Read OTP and output to file."""
+        with open(self.args.file, "wb") as fp:
             self.probeDevice()
             self.probeFlash()
-            self.importAndAssignDevice(self.deviceType.identifier)
-            self.da.connect(self.args.jlink)
-            count, offset = self.da.otp_read(self.args.key)
-            if offset < 0:
-                sys.exit(1)
+            self.dump_to_file(
+                fp, self.da.otp_read_raw, self.args.addr, self.args.length
+            )
 
-        elif self.args.operation == "write_otp":
-            self.probeDevice()
-            self.probeFlash()
-            self.importAndAssignDevice(self.deviceType.identifier)
-            self.da.connect(self.args.jlink)
-            result = self.da.otp_write(self.args.key, self.args.values, self.args.force)
-            if result < 0:
-                sys.exit(1)
+    @functools.cached_property
+    def flash_db(self):
+        """Load the flash database on first access."""
+        return load_flash_database()
 
-        elif self.args.operation == "otp_blank_check":
-            self.probeDevice()
-            self.probeFlash()
-            self.importAndAssignDevice(self.deviceType.identifier)
-            self.da.connect(self.args.jlink)
-            if self.da.otp_blank_check() is True:
-                logging.info("OTP is blank")
-                sys.exit(0)
-            else:
-                logging.info("OTP is NOT blank")
-                sys.exit(1)
+    def map_file(self, fp):
+        """Map a file in memory, its pages are only loaded when accessed.
 
-        elif self.args.operation == "read_otp_hex":
-            self.probeDevice()
-            self.probeFlash()
-            self.importAndAssignDevice(self.deviceType.identifier)
-            self.da.connect(self.args.jlink)
-            data = self.da.otp_read_raw(self.args.addr, self.args.length)
-            current_address = self.args.addr
-            line_width = 16
-            while len(data):
-                dataByes = " ".join("{:02x}".format(x) for x in data[:line_width])
-                logging.info("{:08X}: {}".format(current_address, dataByes))
-                data = data[line_width:]
-                current_address += line_width
-
-        elif self.args.operation == "read_otp_bin":
-            with open(self.args.file, "wb") as fp:
-                self.probeDevice()
-                self.probeFlash()
-                self.importAndAssignDevice(self.deviceType.identifier)
-                self.da.connect(self.args.jlink)
-                data = self.da.otp_read_raw(self.args.addr, self.args.length)
-                for datum in data:
-                    fp.write(datum.to_bytes(1, "little"))
-                fp.close()
+        The mapping is copy-on-write so it can be handed to the J-Link
+        library without copying the file content.
 
-        else:
-            self.parser.print_help(sys.stderr)
-        sys.exit(0)
+        Args:
+            fp: file object opened in binary mode
+        """
+        if os.fstat(fp.fileno()).st_size == 0:
+            # empty files cannot be mapped
+            return contextlib.nullcontext(b"")
+        return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    def dump_to_file(self, fp, read, address, length):
+        """Read a memory range chunk by chunk and write each chunk to a file.
+
+        Args:
+            fp: file object opened in binary mode
+            read: device read function taking an address and a length
+            address: start address
+            length: number of bytes to read
+        """
+        for offset in range(0, length, self.DUMP_CHUNK_SIZE):
+            size = min(self.DUMP_CHUNK_SIZE, length - offset)
+            data = read(address + offset, size)
+            if not data or len(data) < size:
+                logging.error(
+                    "Failed to read %d bytes at 0x%08X", size, address + offset
+                )
+                sys.exit(1)
+            fp.write(bytes(data))
 
     def importAndAssignDevice(self, device):
         """Import the device from the database.
@@ -410,33 +429,49 @@ class ezFlashCLI:
         Args:
             device: device name (string)
         """
-        assert sbdev  # appease Flake8
-        self.da = eval("sbdev.{}".format(device))()
+        # the device classes are only needed once a target is probed
+        import ezFlashCLI.ezFlash.smartbond.smartbondDevices as sbdev
+
+        self.da = getattr(sbdev, device)()
         if self.link.iphost:
             self.da.link.iphost = self.link.iphost
 
     def probeDevice(self):
         """Look for attached smarbond device."""
+        # the device is probed once per invocation
+        if self.deviceType is not None:
+            return
+
         try:
             self.deviceType = self.link.connect(self.args.jlink)
             self.link.close()
 
         except Exception as inst:
-            logging.error("Device not responding: {}".format(inst))
+            logging.error("Device not responding: %s", inst)
+            sys.exit(1)
+
+        if self.deviceType is None:
+            logging.error("Unsupported Smartbond device")
             sys.exit(1)
 
     def probeFlash(self):
         """Look for attached flash."""
-        # try:
+        # the flash is probed once per invocation, flashid may be None
+        if self.flash_probed:
+            return self.flashid
+
+        from ezFlashCLI.ezFlash.pyjlink import pyJLinkException
+
         self.importAndAssignDevice(str(self.deviceType.identifier))
         self.da.connect(self.args.jlink)
-        dev = self.da.flash_probe()
-        self.flashid = self.da.get_flash(dev, self.flash_db)
+        try:
+            dev = self.da.flash_probe()
+        except pyJLinkException as ex:
+            logging.error("No Flash detected %s", ex)
+        else:
+            self.flashid = self.da.get_flash(dev, self.flash_db)
+        self.flash_probed = True
         return self.flashid
-        # except Exception as inst:
-        #     logging.error("No Flash detected {}".format(inst))
-
-        return None
 
     def calculateProductHeader(self):
         """Calculate the product header."""
@@ -446,15 +481,64 @@ class ezFlashCLI:
             self.flashid["flash_write_config_command"],
         )
 
+    def decode_data_bytes(self, values):
+        """Decode a list of decimal or hexadecimal strings to a bytearray.
+
+        Args:
+            values: list of decimal (0-255) or hexadecimal (0x00-0xFF...) strings
+        """
+        data = bytearray()
+        for d in values:
+            try:
+                data += data_bytes(d)
+            except ValueError as ex:
+                logging.error("Failed to decode byte: %s: %s", d, ex)
+                sys.exit(1)
+
+        return data
+
+    def display_hex_dump(self, address, data):
+        """Log data as an hexadecimal dump of 16 bytes per line.
+
+        Args:
+            address: address of the first byte
+            data: list of byte values
+        """
+        # the cli logs through the root logger, skip the formatting when muted
+        if not logging.getLogger().isEnabledFor(logging.INFO):
+            return
+
+        view = memoryview(bytes(data))
+        line_width = 16
+        # emit the lines by blocks to limit the logging lock and write calls
+        lines_per_record = 256
+        line_format = "%08X: %s"
+        record_format = "\n".join([line_format] * lines_per_record)
+        args = []
+        for offset in range(0, len(view), line_width):
+            args.append(address + offset)
+            args.append(view[offset : offset + line_width].hex(" "))
+            if len(args) == 2 * lines_per_record:
+                logging.info(record_format, *args)
+                args.clear()
+        if args:
+            logging.info("\n".join([line_format] * (len(args) // 2)), *args)
+
     def display_jlink_devices(self):
         """List the JLink devices."""
         logging.info("JLink devices:")
         for device in self.devicelist:
-            if device.SerialNumber != 0:
-                logging.info("  - {}".format(device.SerialNumber))
+            logging.info("  - %s", device.SerialNumber)
+
+    def argument_parser(self, argv=None):
+        """Initialize the arguments passed from the command line.
+
+        Args:
+            argv: arguments to parse, defaults to the command line arguments
+        """
+        if argv is None:
+            argv = sys.argv[1:]
 
-    def argument_parser(self):
-        """Initialize the arguments passed from the command line."""
         self.parser = argparse.ArgumentParser(
             description="Smartbond tool v%s - Dialog Smartbond devices flash management tool"
             % __version__,
@@ -508,149 +592,248 @@ class ezFlashCLI:
             dest="operation", help="Run  {command} -h for additional help"
         )
 
-        self.subparsers.add_parser("list", help="list JLink interfaces")
-        self.subparsers.add_parser(
-            "probe", help="Perform Chip detection and its associated flash"
-        )
+        operations = [
+            ("list", "list JLink interfaces", self.op_list, None),
+            (
+                "probe",
+                "Perform Chip detection and its associated flash",
+                self.op_probe,
+                None,
+            ),
+            ("go", "Reset and start the CPU", self.op_go, None),
+            (
+                "erase_flash",
+                "Perform Chip Erase on SPI/QSPI flash",
+                self.op_erase_flash,
+                None,
+            ),
+            (
+                "read_otp",
+                "Read specified OTP config script value",
+                self.op_read_otp,
+                self.add_read_otp_arguments,
+            ),
+            (
+                "write_otp",
+                "Write specified OTP config script value",
+                self.op_write_otp,
+                self.add_write_otp_arguments,
+            ),
+            (
+                "write_flash",
+                "Write binary file at specified address",
+                self.op_write_flash,
+                self.add_write_flash_arguments,
+            ),
+            (
+                "write_flash_bytes",
+                "Write arbitrary data at a specified address",
+                self.op_write_flash_bytes,
+                self.add_write_flash_bytes_arguments,
+            ),
+            (
+                "read_flash",
+                "read data at specified address and length",
+                self.op_read_flash,
+                self.add_read_flash_arguments,
+            ),
+            (
+                "read_otp_hex",
+                "read data at specified address and length",
+                self.op_read_otp_hex,
+                self.add_read_otp_hex_arguments,
+            ),
+            (
+                "image_flash",
+                "Write the flash binary",
+                self.op_image_flash,
+                self.add_image_flash_arguments,
+            ),
+            (
+                "product_header_check",
+                "Read the product header and check",
+                self.op_product_header_check,
+                None,
+            ),
+            (
+                "linker_header",
+                "Generate product header which can be copied in the linker script",
+                self.op_linker_header,
+                None,
+            ),
+            (
+                "image_bootloader_flash",
+                "Write an image to flash and add bootloader",
+                self.op_image_bootloader_flash,
+                self.add_image_bootloader_flash_arguments,
+            ),
+            (
+                "otp_blank_check",
+                "Check if OTP is blank",
+                self.op_otp_blank_check,
+                None,
+            ),
+            (
+                "read_flash_bin",
+                "Read flash and output to file",
+                self.op_read_flash_bin,
+                self.add_read_flash_bin_arguments,
+            ),
+            (
+                "read_otp_bin",
+                "Read OTP and output to file",
+                self.op_read_otp_bin,
+                self.add_read_otp_bin_arguments,
+            ),
+        ]
+
+        arguments = {}
+        for name, help, func, add_arguments in operations:
+            # the help option is added along with the operation arguments so
+            # the first pass does not stop on it
+            subparser = self.subparsers.add_parser(name, help=help, add_help=False)
+            subparser.set_defaults(func=func)
+            arguments[name] = add_arguments
+
+        # a first pass finds the requested operation, only its arguments are
+        # added before the complete parse
+        operation = self.parser.parse_known_args(argv)[0].operation
+        if operation is not None:
+            subparser = self.subparsers.choices[operation]
+            subparser.add_argument(
+                "-h",
+                "--help",
+                action="help",
+                help="show this help message and exit",
+            )
+            if arguments[operation] is not None:
+                arguments[operation](subparser)
 
-        self.subparsers.add_parser("go", help="Reset and start the CPU")
-        self.subparsers.add_parser(
-            "erase_flash", help="Perform Chip Erase on SPI/QSPI flash"
-        )
+        self.args = self.parser.parse_args(argv)
 
-        otp_read_parser = self.subparsers.add_parser(
-            "read_otp", help="Read specified OTP config script value"
-        )
-        otp_read_parser.add_argument(
+    def add_read_otp_arguments(self, parser):
+        """Add the read_otp operation arguments.
+
+        Args:
+            parser: read_otp subparser
+        """
+        parser.add_argument(
             "key",
             nargs="?",
-            type=lambda x: int(x, 0),
+            type=auto_int,
             default=0xFFFFFFFF,
             help="Key to read (example: 0x100c0040)",
         )
 
-        otp_write_parser = self.subparsers.add_parser(
-            "write_otp", help="Write specified OTP config script value"
-        )
-        otp_write_parser.add_argument(
-            "key", type=lambda x: int(x, 0), help="Key to write (example: 0x50020A18)"
+    def add_write_otp_arguments(self, parser):
+        """Add the write_otp operation arguments.
+
+        Args:
+            parser: write_otp subparser
+        """
+        parser.add_argument(
+            "key", type=auto_int, help="Key to write (example: 0x50020A18)"
         )
-        otp_write_parser.add_argument(
+        parser.add_argument(
             "values",
             nargs="+",
-            type=lambda x: int(x, 0),
+            type=auto_int,
             help="Value(s) to write (example: 0x200)",
         )
 
-        otp_write_parser.add_argument(
+        parser.add_argument(
             "--force",
             help="Force adding key even if it already exists",
             action="store_true",
         )
 
-        flash_parser = self.subparsers.add_parser(
-            "write_flash", help="Write binary file at specified address"
-        )
+    def add_write_flash_arguments(self, parser):
+        """Add the write_flash operation arguments.
 
-        flash_parser.add_argument(
-            "addr", type=lambda x: int(x, 0), help="Address in the flash area"
-        )
-        flash_parser.add_argument("filename", help="Binary file path")
+        Args:
+            parser: write_flash subparser
+        """
+        parser.add_argument("addr", type=auto_int, help="Address in the flash area")
+        parser.add_argument("filename", help="Binary file path")
 
-        flash_write_bytes_parser = self.subparsers.add_parser(
-            "write_flash_bytes", help="Write arbitrary data at a specified address"
-        )
+    def add_write_flash_bytes_arguments(self, parser):
+        """Add the write_flash_bytes operation arguments.
 
-        flash_write_bytes_parser.add_argument(
-            "addr", type=lambda x: int(x, 0), help="Address in the flash area"
-        )
+        Args:
+            parser: write_flash_bytes subparser
+        """
+        parser.add_argument("addr", type=auto_int, help="Address in the flash area")
 
-        flash_write_bytes_parser.add_argument(
+        parser.add_argument(
             "data",
             nargs="+",
             default=[],
             help="data bytes list as decimal (0-255) or hexadecimal (0x00-0xFF)",
         )
 
-        flash_parser = self.subparsers.add_parser(
-            "read_flash", help="read data at specified address and length"
-        )
+    def add_read_flash_arguments(self, parser):
+        """Add the read_flash operation arguments.
 
-        flash_parser.add_argument(
-            "addr", type=lambda x: int(x, 0), help="Address in the flash area"
-        )
-        flash_parser.add_argument(
-            "length", type=lambda x: int(x, 0), help="number of bytes to read"
-        )
+        Args:
+            parser: read_flash subparser
+        """
+        parser.add_argument("addr", type=auto_int, help="Address in the flash area")
+        parser.add_argument("length", type=auto_int, help="number of bytes to read")
 
-        read_otp_parser = self.subparsers.add_parser(
-            "read_otp_hex", help="read data at specified address and length"
-        )
+    def add_read_otp_hex_arguments(self, parser):
+        """Add the read_otp_hex operation arguments.
 
-        read_otp_parser.add_argument(
-            "addr", type=lambda x: int(x, 0), help="Address in the otp area"
-        )
-        read_otp_parser.add_argument(
-            "length", type=lambda x: int(x, 0), help="number of bytes to read"
-        )
+        Args:
+            parser: read_otp_hex subparser
+        """
+        parser.add_argument("addr", type=auto_int, help="Address in the otp area")
+        parser.add_argument("length", type=auto_int, help="number of bytes to read")
 
-        flash_parser = self.subparsers.add_parser(
-            "image_flash", help="Write the flash binary"
-        )
-        flash_parser.add_argument("filename", help="Binary file path")
+    def add_image_flash_arguments(self, parser):
+        """Add the image_flash operation arguments.
+
+        Args:
+            parser: image_flash subparser
+        """
+        parser.add_argument("filename", help="Binary file path")
 
-        flash_parser.add_argument(
+        parser.add_argument(
             "--active_image_address",
-            type=lambda x: int(x, 0),
+            type=auto_int,
             required=False,
             help="Active image address",
         )
 
-        flash_parser = self.subparsers.add_parser(
-            "product_header_check", help="Read the product header and check"
-        )
-        flash_parser = self.subparsers.add_parser(
-            "linker_header",
-            help="Generate product header which can be copied in the linker script",
-        )
+    def add_image_bootloader_flash_arguments(self, parser):
+        """Add the image_bootloader_flash operation arguments.
 
-        bootloader_flash_parser = self.subparsers.add_parser(
-            "image_bootloader_flash", help="Write an image to flash and add bootloader"
-        )
-        bootloader_flash_parser.add_argument("filename", help="Binary file path")
+        Args:
+            parser: image_bootloader_flash subparser
+        """
+        parser.add_argument("filename", help="Binary file path")
         # TODO add custom bootloader
 
-        bootloader_flash_parser = self.subparsers.add_parser(
-            "otp_blank_check", help="Check if OTP is blank"
-        )
+    def add_read_flash_bin_arguments(self, parser):
+        """Add the read_flash_bin operation arguments.
 
-        binary_parser = self.subparsers.add_parser(
-            "read_flash_bin",
-            help="Read flash and output to file",
-        )
-        binary_parser.add_argument(
-            "addr", type=lambda x: int(x, 0), help="Address in the flash area"
-        )
-        binary_parser.add_argument(
-            "length", type=lambda x: int(x, 0), help="number of bytes to read"
-        )
+        Args:
+            parser: read_flash_bin subparser
+        """
+        parser.add_argument("addr", type=auto_int, help="Address in the flash area")
+        parser.add_argument("length", type=auto_int, help="number of bytes to read")
 
-        binary_parser.add_argument("file", type=str, help="output file")
+        parser.add_argument("file", type=str, help="output file")
 
-        otp_binary_parser = self.subparsers.add_parser(
-            "read_otp_bin",
-            help="Read OTP and output to file",
-        )
-        otp_binary_parser.add_argument(
-            "addr", type=lambda x: int(x, 0), help="Address in the OTP area"
-        )
-        otp_binary_parser.add_argument(
-            "length", type=lambda x: int(x, 0), help="number of bytes to read"
-        )
+    def add_read_otp_bin_arguments(self, parser):
+        """Add the read_otp_bin operation arguments.
 
-        otp_binary_parser.add_argument("file", type=str, help="output file")
+        Args:
+            parser: read_otp_bin subparser
+        """
+        parser.add_argument("addr", type=auto_int, help="Address in the OTP area")
+        parser.add_argument("length", type=auto_int, help="number of bytes to read")
 
-        self.args = self.parser.parse_args()
+        parser.add_argument("file", type=str, help="output file")
 
 
 def main():
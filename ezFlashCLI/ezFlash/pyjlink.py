@@ -22,6 +22,7 @@
 # OR OTHER DEALINGS IN THE SOFTWARE.
 
 
+import array
 import ctypes
 import logging
 import os
@@ -30,6 +31,36 @@ from enum import IntEnum
 
 from ezFlashCLI.ezFlash.smartbond.supportedDevices import devices
 
+# J-Link libraries already loaded, shared by all the pyjlink instances
+_loaded_libraries = {}
+
+# prototypes of the memory access functions, the arguments are converted in C
+_prototypes = {
+    "JLINKARM_ReadMem": (
+        [ctypes.c_uint32, ctypes.c_uint32, ctypes.c_void_p],
+        ctypes.c_int,
+    ),
+    "JLINKARM_ReadMemU8": (
+        [ctypes.c_uint32, ctypes.c_uint32, ctypes.c_void_p, ctypes.c_void_p],
+        ctypes.c_int,
+    ),
+    "JLINKARM_ReadMemU16": (
+        [ctypes.c_uint32, ctypes.c_uint32, ctypes.c_void_p, ctypes.c_void_p],
+        ctypes.c_int,
+    ),
+    "JLINKARM_ReadMemU32": (
+        [ctypes.c_uint32, ctypes.c_uint32, ctypes.c_void_p, ctypes.c_void_p],
+        ctypes.c_int,
+    ),
+    "JLINKARM_WriteU8": ([ctypes.c_uint32, ctypes.c_uint8], ctypes.c_int),
+    "JLINKARM_WriteU16": ([ctypes.c_uint32, ctypes.c_uint16], ctypes.c_int),
+    "JLINKARM_WriteU32": ([ctypes.c_uint32, ctypes.c_uint32], ctypes.c_int),
+    "JLINKARM_WriteMem": (
+        [ctypes.c_uint32, ctypes.c_uint32, ctypes.c_void_p],
+        ctypes.c_int,
+    ),
+}
+
 
 class JLINKARM_HOSTIF(IntEnum):
     """HOST interface type enumeration."""
@@ -103,10 +134,6 @@ class JLINKARM_EMU_CONNECT_INFO(ctypes.Structure):
         ("aPadding", ctypes.c_ubyte * 34),
     ]  # Pad struct size to 264 bytes
 
-    def __lt__(self, other):
-        """Sort JLink interfaces by increasing SerialNumber."""
-        return self.SerialNumber < other.SerialNumber
-
 
 class JLINKARM_ERROR_CODES(IntEnum):
     """JLink error codes enumeration."""
@@ -188,6 +215,8 @@ class pyjlink(object):
         self.jl = None
         self.logger = logging.getLogger(self.__class__.__name__)
         self.library = None
+        # output buffer of JLINKARM_ExecCommand, reused by every command
+        self.exec_output = ctypes.create_string_buffer(80)
 
     def __del__(self):
         """Close the link on class termination."""
@@ -228,11 +257,18 @@ class pyjlink(object):
                 self.library = os.path.join(
                     os.path.dirname(__file__), "..", "third-party", "segger", dll
                 )
-        try:
-            self.jl = ctypes.CDLL(self.library)
-        except Exception as ex:
-            logging.error("Error loading J-Link Library: {}".format(ex))
-            sys.exit(1)
+        self.jl = _loaded_libraries.get(self.library)
+        if self.jl is None:
+            try:
+                self.jl = ctypes.CDLL(self.library)
+            except Exception as ex:
+                logging.error("Error loading J-Link Library: %s", ex)
+                sys.exit(1)
+            for name, (argtypes, restype) in _prototypes.items():
+                function = getattr(self.jl, name)
+                function.argtypes = argtypes
+                function.restype = restype
+            _loaded_libraries[self.library] = self.jl
 
         self.logger.debug("J-Link library loaded")
 
@@ -262,15 +298,15 @@ class pyjlink(object):
                     serialno = int(serialno)
                 except Exception as ex:
                     self.logger.debug(
-                        "Failed to interpret JLink id: {}, will use default interface\nErr: {}".format(
-                            serialno, ex
-                        )
+                        "Failed to interpret JLink id: %s, will use default interface\nErr: %s",
+                        serialno,
+                        ex,
                     )
                     # return
 
             if serialno:
                 self.logger.debug(
-                    "Selecting J-Link with the serial number: " + str(serialno)
+                    "Selecting J-Link with the serial number: %s", serialno
                 )
                 c_serialno = ctypes.c_uint32(serialno)
                 r = self.jl.JLINKARM_EMU_SelectByUSBSN(c_serialno)
@@ -286,13 +322,9 @@ class pyjlink(object):
             raise pyJLinkException(sError)
 
         self.logger.debug("Select device or core")
-        c_acIn = ctypes.c_char_p(b"Device = " + self.Device)
-        acOut = b" " * 80
-        c_acOut = ctypes.c_char_p(acOut)
-        c_buffersize = ctypes.c_int(80)
-        self.jl.JLINKARM_ExecCommand(c_acIn, c_acOut, c_buffersize)
-        if not acOut[0] == 0:
-            raise pyJLinkException(acOut)
+        sError = self.exec_command(b"Device = " + self.Device)
+        if sError:
+            raise pyJLinkException(sError)
 
         self.logger.debug("Selects the SWD interface")
         ctypes.c_interface = ctypes.c_int(JLINKARM_TIF.JLINKARM_TIF_SWD.value)
@@ -312,33 +344,56 @@ class pyjlink(object):
             raise pyJLinkException("Unspecified error")
         elif r < 0:
             raise pyJLinkException(JLINKARM_ERROR_CODES(r).name)
+        # several devices share their id registers, read each one only once,
+        # a failed read is remembered as None
+        id_reads = {}
+
+        def read_id(access_size, register, size):
+            key = (access_size, register, size)
+            if key not in id_reads:
+                id_reads[key] = None
+                id_reads[key] = tuple(self.rd_mem(access_size, register, size))
+            return id_reads[key]
+
+        found_device = None
         for device in devices:
             try:
-                self.logger.debug("Read " + device.pretty_identifier + " identifier")
-                id = self.rd_mem(device.access_size, device.id_register, device.id_size)
-                if str(id) == device.id:
+                self.logger.debug("Read %s identifier", device.pretty_identifier)
+                id = read_id(device.access_size, device.id_register, device.id_size)
+                if id == device.id:
                     "Extra info deals with the 531_01 rom spin"
                     if len(device.extra_info) > 0:
-                        extra = self.rd_mem(
+                        extra = read_id(
                             device.extra_info[3],
                             device.extra_info[1],
                             device.extra_info[2],
                         )
-                        if str(extra) != device.extra_info[0]:
+                        if extra != device.extra_info[0]:
                             continue
                     found_device = device
                     break
             except Exception as ex:
-                self.logger.debug("Error reading from device: {}".format(ex))
+                self.logger.debug("Error reading from device: %s", ex)
                 continue
-        c_acIn = ctypes.c_char_p(b"DisableInfoWinFlashDL")
-        acOut = b" " * 80
-        c_acOut = ctypes.c_char_p(acOut)
-        c_buffersize = ctypes.c_int(80)
-        self.jl.JLINKARM_ExecCommand(c_acIn, c_acOut, c_buffersize)
+        self.exec_command(b"DisableInfoWinFlashDL")
 
         return found_device
 
+    def exec_command(self, command):
+        """Execute a J-Link command string.
+
+        Args:
+            command: command (bytes)
+
+        Returns:
+            The error message reported by the library, empty on success
+        """
+        ctypes.memset(self.exec_output, 0, len(self.exec_output))
+        self.jl.JLINKARM_ExecCommand(
+            command, self.exec_output, ctypes.c_int(len(self.exec_output))
+        )
+        return self.exec_output.value
+
     def close(self):
         """Close the connection to the target system."""
         self.jl.JLINKARM_Close()
@@ -364,36 +419,86 @@ class pyjlink(object):
 
             values = obj.rd_mem(8,0x2000A000,1024)
         """
-        pStatus = ctypes.c_uint32(0)
-        c_addr = ctypes.c_uint32(addr)
-        c_numItems = ctypes.c_uint32(numItems)
-
+        # the per item status is not needed, pass a NULL pStatus
         if widthBits == 16:
             buftype = ctypes.c_uint16 * int(numItems)
             buf = buftype()
-            status = self.jl.JLINKARM_ReadMemU16(addr, numItems, buf, pStatus)
+            status = self.jl.JLINKARM_ReadMemU16(addr, numItems, buf, None)
 
         elif widthBits == 8:
             buftype = ctypes.c_uint8 * int(numItems)
             buf = buftype()
-            status = self.jl.JLINKARM_ReadMemU8(c_addr, c_numItems, buf, pStatus)
+            status = self.jl.JLINKARM_ReadMemU8(addr, numItems, buf, None)
 
         elif widthBits == 32:
             buftype = ctypes.c_uint32 * int(numItems)
             buf = buftype()
-            status = self.jl.JLINKARM_ReadMemU32(c_addr, c_numItems, buf, pStatus)
+            status = self.jl.JLINKARM_ReadMemU32(addr, numItems, buf, None)
 
-        self.logger.debug(
-            "Read @{:08X}, [{}]".format(addr, ", ".join(hex(i) for i in buf))
-        )
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Read @%08X, [%s]", addr, ", ".join(hex(i) for i in buf))
+
+        if status != numItems:
+            raise pyJLinkException(
+                "Failed to read {} @ 0x{:08X}".format(numItems, addr)
+            )
+
+        # slicing a ctypes integer array builds the list of int in C
+        return buf[:]
+
+    def rd_mem_words(self, addr, numItems):
+        """Read 32-bit words from target memory.
+
+        Args:
+            addr: Memory address
+
+            numItems: Number of words to be read
+
+        Returns:
+            An array of unsigned int ("I") with the numItems words read
+            from the target memory starting at address addr.
+
+        Raises:
+            pyJLinkException: Failed to read data @ addr
+
+        Example::
 
+            words = obj.rd_mem_words(0x2000A000,256)
+        """
+        buf = (ctypes.c_uint32 * int(numItems))()
+        status = self.jl.JLINKARM_ReadMemU32(addr, numItems, buf, None)
         if status != numItems:
             raise pyJLinkException(
                 "Failed to read {} @ 0x{:08X}".format(numItems, addr)
             )
 
-        returnValue = [elem.real for elem in buf]
-        return returnValue
+        words = array.array("I")
+        words.frombytes(memoryview(buf).cast("B"))
+        return words
+
+    def rd_mem_bytes(self, addr, length):
+        """Read a block of bytes from target memory.
+
+        Args:
+            addr: Memory address
+
+            length: Number of bytes to be read
+
+        Returns:
+            The bytes read from the target memory starting at address addr.
+
+        Raises:
+            pyJLinkException: Failed to read data @ addr
+
+        Example::
+
+            data = obj.rd_mem_bytes(0x16000000,0x10000)
+        """
+        buf = ctypes.create_string_buffer(int(length))
+        if self.jl.JLINKARM_ReadMem(addr, length, buf) != 0:
+            raise pyJLinkException("Failed to read {} @ 0x{:08X}".format(length, addr))
+
+        return buf.raw
 
     def wr_mem(self, widthBits, addr, wr_val):
         """Write a unit of widthBits-bits to the target system.
@@ -416,22 +521,37 @@ class pyjlink(object):
 
             stat = obj.wr_mem(8,0x2000A000,20255)
         """
-        c_addr = ctypes.c_uint32(addr)
         if widthBits == 8:
-            self.logger.debug("Written 0x{:02X} to 0x{:08X}".format(wr_val, addr))
-            c_wr_val = ctypes.c_uint8(wr_val)
-            status = self.jl.JLINKARM_WriteU8(c_addr, c_wr_val)
+            self.logger.debug("Written 0x%02X to 0x%08X", wr_val, addr)
+            status = self.jl.JLINKARM_WriteU8(addr, wr_val)
         elif widthBits == 16:
-            self.logger.debug("Written 0x{:04X} to 0x{:08X}".format(wr_val, addr))
-            c_wr_val = ctypes.c_uint16(wr_val)
-            status = self.jl.JLINKARM_WriteU16(c_addr, c_wr_val)
+            self.logger.debug("Written 0x%04X to 0x%08X", wr_val, addr)
+            status = self.jl.JLINKARM_WriteU16(addr, wr_val)
         elif widthBits == 32:
-            self.logger.debug("Written 0x{:08X} to 0x{:08X}".format(wr_val, addr))
-            c_wr_val = ctypes.c_uint32(wr_val)
-            status = self.jl.JLINKARM_WriteU32(c_addr, c_wr_val)
+            self.logger.debug("Written 0x%08X to 0x%08X", wr_val, addr)
+            status = self.jl.JLINKARM_WriteU32(addr, wr_val)
 
         return status
 
+    def wr_mem_buf(self, addr, data):
+        """Write a buffer to the target system in a single transfer.
+
+        Args:
+            addr: Memory address
+
+            data: bytes-like object to be written
+
+        Returns:
+            The number of bytes written, negative on error
+
+        Example::
+
+            stat = obj.wr_mem_buf(0x2000A000, b"\x01\x02")
+        """
+        self.logger.debug("Written %d bytes to 0x%08X", len(data), addr)
+        c_buf = (ctypes.c_uint8 * len(data)).from_buffer_copy(data)
+        return self.jl.JLINKARM_WriteMem(addr, len(data), c_buf)
+
     def reset(self):
         """Reset and halts the core on the target system."""
         self.jl.JLINKARM_Reset()
@@ -465,5 +585,5 @@ class pyjlink(object):
             extension = os.path.splitext(filename)[1][1:]
             ih.fromfile(filename, format=extension)
 
-            for a, d in zip(ih.addresses(), ih.tobinarray()):
-                self.wr_mem(8, addr + a, d)
+            for start, end in ih.segments():
+                self.wr_mem_buf(addr + start, ih.tobinarray(start=start, end=end - 1))
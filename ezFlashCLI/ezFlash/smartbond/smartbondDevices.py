@@ -23,14 +23,22 @@
 
 
 import binascii
+import contextlib
+import functools
 import logging
 import struct
 import sys
 import time
-from ctypes import c_char_p, c_uint32
+from ctypes import c_char, c_char_p, c_uint32
 from enum import IntEnum
 
-from ..pyjlink import pyjlink
+from ..pyjlink import pyjlink, pyJLinkException
+
+try:
+    # zlib-ng folds the CRC with carry-less multiply instructions
+    from zlib_ng.zlib_ng import crc32
+except ImportError:
+    from binascii import crc32
 
 SPI_FLASH_PAGE_SIZE = 256
 SPI_FLASH_SECTOR_SIZE = 4096
@@ -38,6 +46,35 @@ _69X_OTP_BASE_ADDR = 0x10080000
 _69X_OTP_CFG_SCRIPT_ADDR = _69X_OTP_BASE_ADDR + 0x0C00
 
 
+def to_c_buffer(data):
+    """Get a ctypes buffer pointing to a bytes-like object.
+
+    bytes and writable buffers (bytearray, mmap) are not copied.
+
+    Args:
+        data: bytes-like object
+    """
+    if isinstance(data, bytes):
+        return c_char_p(data)
+    try:
+        return (c_char * len(data)).from_buffer(data)
+    except TypeError:
+        # read only buffer
+        return c_char_p(bytes(data))
+
+
+@functools.lru_cache(maxsize=None)
+def parse_config_command(command):
+    """Convert a flash database config command to bytes.
+
+    The parsing is cached, the same flash entry is used for every operation.
+
+    Args:
+        command: space separated hexadecimal bytes, i.e: "0x01 0x00 0x02"
+    """
+    return bytes(int(cmd, 16) for cmd in command.split())
+
+
 class HW_QSPI_BREAK_SEQ_SIZE(IntEnum):
     """QSPI break size enumeration."""
 
@@ -95,10 +132,12 @@ class da14xxx:
         self.flash_address_size = 3
         self.polling_interval = 0.01
         self.wait_timeout = 30
+        # flash configurations indexed by JEDEC id, built on first lookup
+        self.flash_by_id = None
 
         self.link = pyjlink()
         if device:
-            logging.debug("Set device to {}".format(device))
+            logging.debug("Set device to %s", device)
             self.link.Device = device
         self.link.init()
 
@@ -110,6 +149,34 @@ class da14xxx:
             raise Exception("Device not found")
         return id
 
+    def poll_register(self, width, addr, mask, expected, timeout=None):
+        """Wait until a register bitfield reaches the expected value.
+
+        The register is read right away, then with an exponential back-off
+        between the reads, up to polling_interval.
+
+        Args:
+            width: access width (8, 16 or 32)
+            addr: register address
+            mask: bitfield mask
+            expected: expected value of the masked register
+            timeout: maximum wait in seconds, wait_timeout by default
+
+        Raises:
+            pyJLinkException: the value was not reached in time
+        """
+        if timeout is None:
+            timeout = self.wait_timeout
+        deadline = time.monotonic() + timeout
+        delay = 0.0002
+        while (self.link.rd_mem(width, addr, 1)[0] & mask) != expected:
+            if time.monotonic() > deadline:
+                raise pyJLinkException(
+                    "Timeout polling register 0x{:08X}, mask 0x{:X}".format(addr, mask)
+                )
+            time.sleep(delay)
+            delay = min(delay * 2, self.polling_interval)
+
     def get_flash(self, flashId, flash_db):
         """Get the flash device id and return its name.
 
@@ -121,15 +188,20 @@ class da14xxx:
             Flash configuration
 
         """
-        for flash in flash_db["flash_configurations"]:
-            if flashId == (
-                int(flash["flash_manufacturer"], 16),
-                int(flash["flash_device_type"], 16),
-                int(flash["flash_density"], 16),
-            ):
-                return flash
+        if self.flash_by_id is None:
+            self.flash_by_id = {}
+            for flash in flash_db["flash_configurations"]:
+                # keep the first entry, as the linear search did
+                self.flash_by_id.setdefault(
+                    (
+                        int(flash["flash_manufacturer"], 16),
+                        int(flash["flash_device_type"], 16),
+                        int(flash["flash_density"], 16),
+                    ),
+                    flash,
+                )
 
-        return None
+        return self.flash_by_id.get(flashId)
 
     def flash_configure_controller(self, flashid):
         """Set the controller in Continuous mode according flash configuration parameters.
@@ -202,17 +274,24 @@ class da1453x_da1458x(da14xxx):
     # Word Size 32 bits
     SPI_MODE_32BIT = 2
 
+    # constant SPI flash command sequences, dummy bytes clock the answer
+    FLASH_READ_JEDEC_ID_SEQUENCE = bytes(
+        (HW_QSPI_COMMON_CMD.READ_JEDEC_ID, 0xFF, 0xFF, 0xFF)
+    )
+    FLASH_CLEAR_STATUS_SEQUENCE = bytes(
+        (HW_QSPI_COMMON_CMD.WRITE_STATUS_REGISTER, 0x00)
+    )
+
     def __init__(self, device=None):
         """Initalizate the da14xxxx parent devices class."""
         da14xxx.__init__(self, device)
+        # the SPI pads and controller setup is lost on reset
+        self.flash_initialized = False
 
-    def shift16(self, a):
-        """Shit function."""
-        shift = 0
-        while not (a & 0x1):
-            shift += 1
-            a = a >> 1
-        return shift
+    def reset(self):
+        """Reset and halt the cpu."""
+        self.link.reset()
+        self.flash_initialized = False
 
     def SetWord16(self, addr, data):
         """Write a 16 bits word."""
@@ -220,10 +299,41 @@ class da1453x_da1458x(da14xxx):
 
     def SetBits16(self, addr, bitfield_mask, data):
         """Set a 16 bits word according to the mask."""
+        current = self.link.rd_mem(16, addr, 1)[0]
+        reg = (current & (~bitfield_mask)) & 0xFFFF
+        # shifting to the mask position is a multiply by its lowest bit
+        wr_data = reg | (data * (bitfield_mask & -bitfield_mask))
+        # the bitfield already holds the value, spare the write access
+        if wr_data != current:
+            self.link.wr_mem(16, addr, wr_data)
+
+    def SetBits16Sequence(self, addr, fields):
+        """Apply successive bitfield updates to a 16 bits word.
+
+        The register is read once, the intermediate values are computed
+        locally and written in order.
+
+        Args:
+            addr: register address
+            fields: sequence of (bitfield_mask, data) pairs
+        """
         reg = self.link.rd_mem(16, addr, 1)[0]
-        reg = (reg & (~bitfield_mask)) & 0xFFFF
-        wr_data = reg | (data << (self.shift16(bitfield_mask)))
-        self.link.wr_mem(16, addr, wr_data)
+        for bitfield_mask, data in fields:
+            reg = (reg & (~bitfield_mask)) & 0xFFFF
+            reg |= data * (bitfield_mask & -bitfield_mask)
+            self.link.wr_mem(16, addr, reg)
+
+    def spi_transfer(self, data):
+        """Send a byte sequence over the SPI interface.
+
+        Args:
+            data: bytes to send
+
+        Returns:
+            The list of bytes received during the transfer
+        """
+        spi_access8 = self.spi_access8
+        return [spi_access8(byte) for byte in data]
 
     def GPIO_SetPinFunction(self, port, pin, mode, function):
         """Set GPIO Pin function."""
@@ -250,22 +360,26 @@ class da1453x_da1458x(da14xxx):
             address: 24 bits int
             length: access length
         """
-        read_data = []
+        read_data = bytearray(length)
 
         self.flash_init()
 
         self.spi_cs_low()
-        self.spi_access8(HW_QSPI_COMMON_CMD.READ_DATA)
-        self.spi_access8(address & 0xFF)
-        self.spi_access8((address >> 8) & 0xFF)
-        self.spi_access8((address >> 16) & 0xFF)
-        while length:
-            read_data.append(self.spi_access8(0xFF))
-            length -= 1
+        self.spi_transfer(
+            (
+                HW_QSPI_COMMON_CMD.READ_DATA,
+                address & 0xFF,
+                (address >> 8) & 0xFF,
+                (address >> 16) & 0xFF,
+            )
+        )
+        spi_access8 = self.spi_access8
+        for i in range(length):
+            read_data[i] = spi_access8(0xFF)
 
         self.spi_cs_high()
 
-        return read_data
+        return bytes(read_data)
 
     def flash_probe(self):
         """Probe the flash device.
@@ -274,7 +388,7 @@ class da1453x_da1458x(da14xxx):
             None
         """
         # reset and halt the cpu
-        self.link.reset()
+        self.reset()
 
         # init the flash
         self.flash_init()
@@ -282,10 +396,9 @@ class da1453x_da1458x(da14xxx):
         # read JEADEC id
         self.spi_set_bitmode(self.SPI_MODE_8BIT)
         self.spi_cs_low()
-        self.spi_access8(HW_QSPI_COMMON_CMD.READ_JEDEC_ID)
-        manufacturer = self.spi_access8(0xFF)
-        deviceId = self.spi_access8(0xFF)
-        density = self.spi_access8(0xFF)
+        _, manufacturer, deviceId, density = self.spi_transfer(
+            self.FLASH_READ_JEDEC_ID_SEQUENCE
+        )
         self.spi_cs_high()
 
         return (manufacturer, deviceId, density)
@@ -297,7 +410,7 @@ class da1453x_da1458x(da14xxx):
             None
         """
         # reset and halt the cpu
-        self.link.reset()
+        self.reset()
 
         # init the flash
         self.flash_init()
@@ -318,7 +431,7 @@ class da1453x_da1458x(da14xxx):
         """
         logging.debug("Disabling flash protection.")
         # reset and halt the cpu
-        self.link.reset()
+        self.reset()
 
         # init the flash
         self.flash_init()
@@ -328,8 +441,7 @@ class da1453x_da1458x(da14xxx):
         self.spi_cs_high()
 
         self.spi_cs_low()
-        self.spi_access8(HW_QSPI_COMMON_CMD.WRITE_STATUS_REGISTER)
-        self.spi_access8(0x00)
+        self.spi_transfer(self.FLASH_CLEAR_STATUS_SEQUENCE)
         self.spi_cs_high()
 
     def flash_erase(self):
@@ -339,7 +451,7 @@ class da1453x_da1458x(da14xxx):
             None
         """
         # reset and halt the cpu
-        self.link.reset()
+        self.reset()
 
         # init the flash
         self.flash_init()
@@ -358,8 +470,16 @@ class da1453x_da1458x(da14xxx):
         self.spi_cs_low()
         self.spi_access8(HW_QSPI_COMMON_CMD.READ_STATUS_REGISTER)
 
+        # chip erase takes seconds, back off instead of spinning on the link
+        deadline = time.monotonic() + self.wait_timeout
+        delay = 0.001
         while self.spi_access8(HW_QSPI_COMMON_CMD.READ_STATUS_REGISTER) & 0x1:
-            pass
+            if time.monotonic() > deadline:
+                self.spi_cs_high()
+                logging.error("Timeout waiting for the chip erase to complete")
+                return 0
+            time.sleep(delay)
+            delay = min(delay * 2, self.polling_interval)
         self.spi_cs_high()
 
         return 1
@@ -383,23 +503,29 @@ class da1453x_da1458x(da14xxx):
                 logging.info("append booting data")
                 header = b"\x70\x50\x00\x00\x00\x00" + struct.pack(">H", len(fileData))
 
-                data = header + fileData
+                # header and image are written separately to avoid copying the image
+                chunks = (header, fileData)
         else:
             # bootable image
-            data = fileData
+            chunks = (fileData,)
 
         if self.flash_get_software_protection() != 0:
             self.flash_software_unprotect()
 
+        # the J-Link flash loader sets up the SPI on its own
+        self.flash_initialized = False
         self.link.jl.JLINKARM_BeginDownload(c_uint32(0))
-        self.link.jl.JLINKARM_WriteMem(self.FLASH_ARRAY_BASE, len(data), c_char_p(data))
+        address = self.FLASH_ARRAY_BASE
+        for chunk in chunks:
+            self.link.jl.JLINKARM_WriteMem(address, len(chunk), to_c_buffer(chunk))
+            address += len(chunk)
         bytes_flashed = self.link.jl.JLINKARM_EndDownload()
         if bytes_flashed < 0:
-            logging.error("Download failed with code: {}".format(bytes_flashed))
+            logging.error("Download failed with code: %s", bytes_flashed)
             return 0
 
         # reset and halt the cpu
-        self.link.reset()
+        self.reset()
 
         return 1
 
@@ -413,21 +539,21 @@ class da1453x_da1458x(da14xxx):
         if self.flash_get_software_protection() != 0:
             self.flash_software_unprotect()
 
+        # the J-Link flash loader sets up the SPI on its own
+        self.flash_initialized = False
         self.link.jl.JLINKARM_BeginDownload(c_uint32(0))
         self.link.jl.JLINKARM_WriteMem(
-            self.FLASH_ARRAY_BASE + address, len(fileData), c_char_p(fileData)
+            self.FLASH_ARRAY_BASE + address, len(fileData), to_c_buffer(fileData)
         )
         bytes_flashed = self.link.jl.JLINKARM_EndDownload()
         if bytes_flashed < 0:
             logging.error(
-                "Download failed with code: @address {}, {}".format(
-                    address, bytes_flashed
-                )
+                "Download failed with code: @address %s, %s", address, bytes_flashed
             )
             return 0
 
         # reset and halt the cpu
-        self.link.reset()
+        self.reset()
 
         return 1
 
@@ -437,16 +563,14 @@ class da1453x_da1458x(da14xxx):
         Args:
             Image: byte array containing the application
         """
-        header = (
-            b"\x70\x51\xAA\x01"  # Signature
-            + struct.pack("<I", len(image))  # Binary size
-            + struct.pack("<I", binascii.crc32(image))  # Crc32
-            + b"ezFlashCLI\x00\x00\x00\x00\x00\x00"  # Version string
-            + struct.pack("<I", int(time.time()))  # Timestamp
-        )
-        for i in range(32):
-            header += struct.pack("b", 0x0)
-        return header
+        return struct.pack(
+            "<4sII16sI32x",
+            b"\x70\x51\xAA\x01",  # Signature
+            len(image),  # Binary size
+            crc32(image),  # Crc32
+            b"ezFlashCLI",  # Version string, zero padded
+            int(time.time()),  # Timestamp
+        )  # followed by 32 zero bytes
 
     def flash_program_image_with_bootloader(self, parameters):
         """Program a secondary bootloader and an image in the flash.
@@ -477,10 +601,8 @@ class da1453x_da1458x(da14xxx):
             image1_address = parameters["image1_address"]
         if "image2_address" in parameters and parameters["image2_address"] is not None:
             image2_address = parameters["image2_address"]
-        product_header = (
-            b"\x70\x52\x00\x00"
-            + struct.pack("<I", image1_address)
-            + struct.pack("<I", image2_address)
+        product_header = struct.pack(
+            "<4sII", b"\x70\x52\x00\x00", image1_address, image2_address
         )
 
         if fileData[0] != 0x70 or fileData[1] != 0x51:
@@ -564,7 +686,7 @@ class da14531(da1453x_da1458x):
 
     def go(self):
         """Reset to ROM and start executing."""
-        self.link.reset()
+        self.reset()
         debugger_setting = (
             self.link.rd_mem(16, self.SYS_CTRL_REG, 1)[0] & 0x180
         )  # read the current debugger setup
@@ -578,7 +700,7 @@ class da14531(da1453x_da1458x):
             | self.SYS_CTRL_REG_SW_RESET_MSK
             | debugger_setting,
         )
-        self.link.reset()
+        self.reset()
         self.link.go()
 
     def spi_cs_low(self):
@@ -597,6 +719,9 @@ class da14531(da1453x_da1458x):
         Args:
             None
         """
+        if self.flash_initialized:
+            return
+
         self.SetWord16(self.CLK_AMBA_REG, 0x00)  # set clocks (hclk and pclk ) 16MHz
         self.SetWord16(self.SET_FREEZE_REG, 0x8)  # stop watch dog
         self.SetBits16(self.PAD_LATCH_REG, 0x1, 1)  # open pads
@@ -631,36 +756,34 @@ class da14531(da1453x_da1458x):
         # Set SPI clock edge capture data
         self.SetBits16(self.SPI_CTRL_REG, 0x0040, 0)
 
+        self.flash_initialized = True
+
     def spi_access8(self, dataToSend):
         """Send data over the SPI interface.
 
         Args:
             dataToSend: Byte array
         """
-        dataRead = 0
-
-        # Clear Tx, Rx and DMA enable paths in Control Register
-        self.SetBits16(self.SPI_CTRL_REG, 0x1F, 0)
-
-        # Enable TX path
-        self.SetBits16(self.SPI_CTRL_REG, 0x2, 1)
-        # Enable RX path
-        self.SetBits16(self.SPI_CTRL_REG, 0x4, 1)
-        # Enable SPI
-        self.SetBits16(self.SPI_CTRL_REG, 0x1, 1)
+        self.SetBits16Sequence(
+            self.SPI_CTRL_REG,
+            (
+                (0x1F, 0),  # Clear Tx, Rx and DMA enable paths
+                (0x2, 1),  # Enable TX path
+                (0x4, 1),  # Enable RX path
+                (0x1, 1),  # Enable SPI
+            ),
+        )
 
         # Write (low part of) dataToSend
         self.SetWord16(self.SPI_FIFO_WRITE_REG, dataToSend)
 
         # Wait while RX FIFO is empty
-        while (self.link.rd_mem(16, self.SPI_FIFO_STATUS_REG, 1)[0] & 0x1000) != 0:
-            pass
+        self.poll_register(16, self.SPI_FIFO_STATUS_REG, 0x1000, 0)
 
         dataRead = self.link.rd_mem(16, self.SPI_FIFO_READ_REG, 1)[0] & 0xFF
 
         # Wait until transaction is finished and SPI is not busy
-        while (self.link.rd_mem(16, self.SPI_FIFO_STATUS_REG, 1)[0] & 0x8000) != 0:
-            pass
+        self.poll_register(16, self.SPI_FIFO_STATUS_REG, 0x8000, 0)
         return dataRead
 
     def spi_set_bitmode(self, spi_wsz):
@@ -680,8 +803,7 @@ class da14531(da1453x_da1458x):
             self.link.wr_mem(32, self.OTPC_MODE_REG, mode)
 
         # Wait for mode change
-        while (self.link.rd_mem(32, self.OTPC_STAT_REG, 1)[0] & 0x4) == 0:
-            pass
+        self.poll_register(32, self.OTPC_STAT_REG, 0x4, 0x4)
 
     def otp_init(self):
         """Init the OTP controller."""
@@ -700,19 +822,12 @@ class da14531(da1453x_da1458x):
         """Check if the program area of OTP is blank."""
         self.otp_init()
         self.otp_set_mode(self.OTPC_MODE_READ)
-        otp_contents = self.link.rd_mem(32, self.OTP_START, self.OTP_CELL_NUM)
-        otp_blank = True
-        header_blank = True
-        for entry in range(self.OTP_CELL_NUM - self.OTP_HEADER_CELL_NUM):
-            if otp_contents[entry] != 0xFFFFFFFF:
-                otp_blank = False
-                break
-        for entry in range(
-            self.OTP_CELL_NUM - self.OTP_HEADER_CELL_NUM, self.OTP_CELL_NUM
-        ):
-            if otp_contents[entry] != 0xFFFFFFFF:
-                header_blank = False
-                break
+        otp_contents = self.link.rd_mem_words(self.OTP_START, self.OTP_CELL_NUM)
+        program_cells = self.OTP_CELL_NUM - self.OTP_HEADER_CELL_NUM
+        otp_blank = otp_contents[:program_cells].count(0xFFFFFFFF) == program_cells
+        header_blank = (
+            otp_contents[program_cells:].count(0xFFFFFFFF) == self.OTP_HEADER_CELL_NUM
+        )
         if header_blank is True:
             logging.error(
                 "The OTP header is blank, this shouldn't be possible. Please ensure the connection to the chip is correct"
@@ -734,7 +849,14 @@ class da14531(da1453x_da1458x):
         self.otp_init()
         self.otp_set_mode(self.OTPC_MODE_READ)
 
-        return self.link.rd_mem(8, address, length)
+        # read whole 32 bits cells and keep the requested bytes
+        start = address & ~0x3
+        end = (address + length + 0x3) & ~0x3
+        words = self.link.rd_mem_words(start, (end - start) >> 2)
+        if sys.byteorder == "big":
+            words.byteswap()
+        offset = address - start
+        return words.tobytes()[offset : offset + length]
 
     def release_reset(self):
         """On 531 the reset pin is shared with the default flash MOSI pin.
@@ -743,6 +865,7 @@ class da14531(da1453x_da1458x):
         """
         self.link.wr_mem(16, self.HWR_CTRL_REG, 0x0)
         self.link.wr_mem(16, self.P00_MODE_REG, self.P00_MODE_REG_RESET)
+        self.flash_initialized = False
 
     def flash_program_image(self, fileData, parameters):
         """Program an image in the flash.
@@ -827,14 +950,13 @@ class da14585(da1453x_da1458x):
         self.SetWord16(self.SPI_RX_TX_REG0, dataToSend)
 
         # Polling to wait for spi transmission
-        while (self.link.rd_mem(16, self.SPI_CTRL_REG, 1)[0] & 0x2000) == 0:
-            pass
+        self.poll_register(16, self.SPI_CTRL_REG, 0x2000, 0x2000)
 
         # Clear pending flag
         self.SetWord16(self.SPI_CLEAR_INT, 0x1)
 
         # Return data read from spi slave
-        return self.link.rd_mem(16, self.SPI_RX_TX_REG0, 1)[0]
+        return self.link.rd_mem(16, self.SPI_RX_TX_REG0, 1)[0] & 0xFF
 
     def flash_init(self):
         """Initialize flash controller and make sure the Flash device exits low power mode.
@@ -842,6 +964,9 @@ class da14585(da1453x_da1458x):
         Args:
             None
         """
+        if self.flash_initialized:
+            return
+
         self.SetWord16(self.CLK_AMBA_REG, 0x00)  # set clocks (hclk and pclk ) 16MHz
         self.SetWord16(self.SET_FREEZE_REG, 0x8)  # stop watch dog
         self.SetBits16(self.SYS_CTRL_REG, 0x0180, 0x3)  # SWD_DIO = P0_10
@@ -849,8 +974,7 @@ class da14585(da1453x_da1458x):
         # enable the peripheral power domain
         self.SetBits16(self.PMU_CTRL_REG, 0x2, 0x0)
 
-        while (self.link.rd_mem(16, self.SYS_STAT_REG, 1)[0] & 0x8) == 0:
-            pass
+        self.poll_register(16, self.SYS_STAT_REG, 0x8, 0x8)
 
         self.GPIO_SetPinFunction(self.SPI_PORT, self.SPI_CS_PIN, 0x300, 8)  # SPI_CS
         self.GPIO_SetActive(self.SPI_PORT, self.SPI_CS_PIN)
@@ -869,6 +993,8 @@ class da14585(da1453x_da1458x):
         # Set SPI mode on
         self.SetBits16(self.SPI_CTRL_REG, 0x1, 0x1)
 
+        self.flash_initialized = True
+
 
 class da14531_00(da14531):
     """Derived class for the da14531-00 devices."""
@@ -921,7 +1047,7 @@ class da1468x_da1469x_da1470x(da14xxx):
             address: 24 bits int
             length: int
         """
-        return self.link.rd_mem(8, self.FLASH_READ_ARRAY_BASE + address, length)
+        return self.link.rd_mem_bytes(self.FLASH_READ_ARRAY_BASE + address, length)
 
     def flash_hw_qspi_cs_enable(self):
         """Enable QSPI CS.
@@ -939,6 +1065,18 @@ class da1468x_da1469x_da1470x(da14xxx):
         """
         self.link.wr_mem(32, self.QSPIC_CTRLBUS_REG, 0x10)
 
+    @contextlib.contextmanager
+    def flash_hw_qspi_cs(self):
+        """Keep the QSPI CS enabled for the duration of a with block.
+
+        CS is released even when the block raises.
+        """
+        self.flash_hw_qspi_cs_enable()
+        try:
+            yield
+        finally:
+            self.flash_hw_qspi_cs_disable()
+
     def flash_set_automode(self, mode):
         """Set the device in automode.
 
@@ -947,9 +1085,12 @@ class da1468x_da1469x_da1470x(da14xxx):
         """
         ctrlmode = self.link.rd_mem(32, self.QSPIC_CTRLMODE_REG, 1)[0]
         if mode:
-            self.link.wr_mem(32, self.QSPIC_CTRLMODE_REG, ctrlmode | 0x1)
+            new_ctrlmode = ctrlmode | 0x1
         else:
-            self.link.wr_mem(32, self.QSPIC_CTRLMODE_REG, ctrlmode & ~(0x1))
+            new_ctrlmode = ctrlmode & ~(0x1)
+        # write only when the mode changes
+        if new_ctrlmode != ctrlmode:
+            self.link.wr_mem(32, self.QSPIC_CTRLMODE_REG, new_ctrlmode)
         return True
 
     def flash_set_busmode(self, mode):
@@ -968,8 +1109,9 @@ class da1468x_da1469x_da1470x(da14xxx):
             # read the ctrlmode reg
             ctrlmode = self.link.rd_mem(32, self.QSPIC_CTRLMODE_REG, 1)[0]
 
-            # writte the data line mode
-            self.link.wr_mem(32, self.QSPIC_CTRLMODE_REG, ctrlmode | 0x3C)
+            # writte the data line mode, if not already set
+            if (ctrlmode | 0x3C) != ctrlmode:
+                self.link.wr_mem(32, self.QSPIC_CTRLMODE_REG, ctrlmode | 0x3C)
 
         elif mode == HW_QSPI_BUS_MODE.DUAL:
             raise Exception("unsupported DUAL SPI mode")
@@ -981,8 +1123,9 @@ class da1468x_da1469x_da1470x(da14xxx):
             # read the ctrlmode reg
             ctrlmode = self.link.rd_mem(32, self.QSPIC_CTRLMODE_REG, 1)[0]
 
-            # writte the data line mode
-            self.link.wr_mem(32, self.QSPIC_CTRLMODE_REG, ctrlmode & ~(0xC))
+            # writte the data line mode, if not already set
+            if ctrlmode & 0xC:
+                self.link.wr_mem(32, self.QSPIC_CTRLMODE_REG, ctrlmode & ~(0xC))
 
         return True
 
@@ -994,6 +1137,20 @@ class da1468x_da1469x_da1470x(da14xxx):
         """
         self.link.wr_mem(8, self.QSPIC_WRITEDATA_REG, data)
 
+    def flash_hw_qspi_write(self, data):
+        """Write a sequence of bytes on the qspi interface.
+
+        Each byte is a separate access: the transfer size is given by the
+        access width and a memory burst would run into QSPIC_READDATA_REG.
+
+        Args:
+            data: bytes
+        """
+        wr_mem = self.link.wr_mem
+        addr = self.QSPIC_WRITEDATA_REG
+        for byte in data:
+            wr_mem(8, addr, byte)
+
     def flash_hw_qspi_read8(self):
         """Read a byte on the qspi interface.
 
@@ -1009,20 +1166,20 @@ class da1468x_da1469x_da1470x(da14xxx):
         Args:
             None
         """
-        wait_time = 0
+        # page programs complete in well under polling_interval, start with
+        # short sleeps and back off for the long erase operations
+        deadline = time.monotonic() + self.wait_timeout
+        delay = 0.0002
+        with self.flash_hw_qspi_cs():
+            self.flash_hw_qspi_write8(HW_QSPI_COMMON_CMD.READ_STATUS_REGISTER)
+            while self.flash_hw_qspi_read8() & 0x1:
+                if time.monotonic() > deadline:
+                    return False
+
+                time.sleep(delay)
+                delay = min(delay * 2, self.polling_interval)
 
-        self.flash_hw_qspi_cs_enable()
-        self.flash_hw_qspi_write8(HW_QSPI_COMMON_CMD.READ_STATUS_REGISTER)
-        while True:
-            status = self.flash_hw_qspi_read8()
-            if not (status & 0x1):
-                self.flash_hw_qspi_cs_disable()
-                return True
-            if wait_time > self.wait_timeout:
-                return False
-
-            time.sleep(self.polling_interval)
-            wait_time += self.polling_interval
+        return True
 
     def flash_erase(self):
         """Erase the flash content.
@@ -1038,13 +1195,11 @@ class da1468x_da1469x_da1470x(da14xxx):
         self.flash_reset()
 
         # send flash erase
-        self.flash_hw_qspi_cs_enable()
-        self.flash_hw_qspi_write8(HW_QSPI_COMMON_CMD.WRITE_ENABLE)
-        self.flash_hw_qspi_cs_disable()
+        with self.flash_hw_qspi_cs():
+            self.flash_hw_qspi_write8(HW_QSPI_COMMON_CMD.WRITE_ENABLE)
 
-        self.flash_hw_qspi_cs_enable()
-        self.flash_hw_qspi_write8(HW_QSPI_COMMON_CMD.CHIP_ERASE)
-        self.flash_hw_qspi_cs_disable()
+        with self.flash_hw_qspi_cs():
+            self.flash_hw_qspi_write8(HW_QSPI_COMMON_CMD.CHIP_ERASE)
 
         self.whileFlashBusy()  # wait for the operation to be over
 
@@ -1065,17 +1220,14 @@ class da1468x_da1469x_da1470x(da14xxx):
         self.flash_set_busmode(HW_QSPI_BUS_MODE.SINGLE)
 
         # send flash erase
-        self.flash_hw_qspi_cs_enable()
-        self.flash_hw_qspi_write8(HW_QSPI_COMMON_CMD.WRITE_ENABLE)
-        self.flash_hw_qspi_cs_disable()
-
-        self.flash_hw_qspi_cs_enable()
-        self.flash_hw_qspi_write8(HW_QSPI_COMMON_CMD.SECTOR_ERASE)
-
-        for data in address.to_bytes(self.flash_address_size, "big"):
-            self.flash_hw_qspi_write8(data)
+        with self.flash_hw_qspi_cs():
+            self.flash_hw_qspi_write8(HW_QSPI_COMMON_CMD.WRITE_ENABLE)
 
-        self.flash_hw_qspi_cs_disable()
+        with self.flash_hw_qspi_cs():
+            self.flash_hw_qspi_write(
+                bytes((HW_QSPI_COMMON_CMD.SECTOR_ERASE,))
+                + address.to_bytes(self.flash_address_size, "big")
+            )
 
         self.whileFlashBusy()
 
@@ -1088,32 +1240,26 @@ class da1468x_da1469x_da1470x(da14xxx):
 
         Args:
             address: Address (int)
-            data: bytes
+            data_array: bytes-like object
         """
+        # any buffer is accepted (bytes, bytearray, mmap, memoryview), others
+        # raise a TypeError
+        data_array = memoryview(data_array).cast("B")
         if not len(data_array):
             raise Exception("data is empty")
 
-        if isinstance(data_array, bytes):
-            print(type(data_array), type(bytes))
-            raise Exception("data should be byte it is {}".format(type(data_array)))
-
         self.flash_set_automode(False)
         self.flash_set_busmode(HW_QSPI_BUS_MODE.SINGLE)
 
-        self.flash_hw_qspi_cs_enable()
-        self.flash_hw_qspi_write8(HW_QSPI_COMMON_CMD.WRITE_ENABLE)
-        self.flash_hw_qspi_cs_disable()
-
-        self.flash_hw_qspi_cs_enable()
-        self.flash_hw_qspi_write8(HW_QSPI_COMMON_CMD.PAGE_PROGRAM)
-
-        for data in address.to_bytes(self.flash_address_size, "big"):
-            self.flash_hw_qspi_write8(data)
-
-        for data in data_array:
-            self.flash_hw_qspi_write8(data)
+        with self.flash_hw_qspi_cs():
+            self.flash_hw_qspi_write8(HW_QSPI_COMMON_CMD.WRITE_ENABLE)
 
-        self.flash_hw_qspi_cs_disable()
+        with self.flash_hw_qspi_cs():
+            self.flash_hw_qspi_write(
+                bytes((HW_QSPI_COMMON_CMD.PAGE_PROGRAM,))
+                + address.to_bytes(self.flash_address_size, "big")
+            )
+            self.flash_hw_qspi_write(data_array)
 
         self.whileFlashBusy()
 
@@ -1126,13 +1272,10 @@ class da1468x_da1469x_da1470x(da14xxx):
         Args:
             breakSize: HW_QSPI_BREAK_SEQ_SIZE
         """
-        self.flash_hw_qspi_cs_enable()
-
-        self.flash_hw_qspi_write8(HW_QSPI_COMMON_CMD.EXIT_CONTINUOUS_MODE)
-        if breakSize == HW_QSPI_BREAK_SEQ_SIZE.SIZE_2B:
+        with self.flash_hw_qspi_cs():
             self.flash_hw_qspi_write8(HW_QSPI_COMMON_CMD.EXIT_CONTINUOUS_MODE)
-
-        self.flash_hw_qspi_cs_disable()
+            if breakSize == HW_QSPI_BREAK_SEQ_SIZE.SIZE_2B:
+                self.flash_hw_qspi_write8(HW_QSPI_COMMON_CMD.EXIT_CONTINUOUS_MODE)
 
     def flash_reset(self):
         """Reset the flash.
@@ -1185,12 +1328,11 @@ class da1468x_da1469x_da1470x(da14xxx):
         self.flash_set_automode(False)
 
         # read JEADEC id
-        self.flash_hw_qspi_cs_enable()
-        self.flash_hw_qspi_write8(HW_QSPI_COMMON_CMD.READ_JEDEC_ID)
-        manufacturer = self.flash_hw_qspi_read8()
-        deviceId = self.flash_hw_qspi_read8()
-        density = self.flash_hw_qspi_read8()
-        self.flash_hw_qspi_cs_disable()
+        with self.flash_hw_qspi_cs():
+            self.flash_hw_qspi_write8(HW_QSPI_COMMON_CMD.READ_JEDEC_ID)
+            manufacturer = self.flash_hw_qspi_read8()
+            deviceId = self.flash_hw_qspi_read8()
+            density = self.flash_hw_qspi_read8()
 
         # set automode
         self.flash_set_automode(True)
@@ -1208,19 +1350,15 @@ class da1468x_da1469x_da1470x(da14xxx):
         self.flash_set_busmode(HW_QSPI_BUS_MODE.QUAD)
 
         # issue a write enable
-        self.flash_hw_qspi_cs_enable()
-        self.flash_hw_qspi_write8(HW_QSPI_COMMON_CMD.WRITE_ENABLE)
-        self.flash_hw_qspi_cs_disable()
+        with self.flash_hw_qspi_cs():
+            self.flash_hw_qspi_write8(HW_QSPI_COMMON_CMD.WRITE_ENABLE)
 
         # issue config sequence
-        configCommand = flashid["flash_write_config_command"].split(" ")
-
-        self.flash_hw_qspi_cs_enable()
-
-        for cmd in configCommand[:-1]:  # the last one is a termation character
-            self.flash_hw_qspi_write8(int(cmd[2:], 16))
+        configCommand = parse_config_command(flashid["flash_write_config_command"])
 
-        self.flash_hw_qspi_cs_disable()
+        with self.flash_hw_qspi_cs():
+            # the last one is a termation character
+            self.flash_hw_qspi_write(configCommand[:-1])
 
         self.link.wr_mem(
             32,
@@ -1240,9 +1378,6 @@ class da1468x_da1469x_da1470x(da14xxx):
                 int(flashid["flash_ctrlmode_reg_value"][2:], 16),
             )
 
-        self.link.rd_mem(32, self.QSPIC_BURSTCMDA_REG, 1)
-        self.link.rd_mem(32, self.QSPIC_BURSTCMDB_REG, 1)
-        self.link.rd_mem(32, self.QSPIC_CTRLMODE_REG, 1)
         self.flash_set_busmode(HW_QSPI_BUS_MODE.QUAD)
         self.flash_set_automode(True)
 
@@ -1253,16 +1388,25 @@ class da1468x_da1469x_da1470x(da14xxx):
             my_data_array: bytes array
             address: destination address
         """
+        return self.flash_program_segments([(my_data_array, address)])
+
+    def flash_program_segments(self, segments):
+        """Program several raw data buffers in the flash in a single download.
+
+        Args:
+            segments: list of (bytes array, destination address) pairs
+        """
         self.link.jl.JLINKARM_BeginDownload(c_uint32(0))
-        self.link.jl.JLINKARM_WriteMem(
-            self.FLASH_ARRAY_BASE + address, len(my_data_array), c_char_p(my_data_array)
-        )
+        for data, address in segments:
+            self.link.jl.JLINKARM_WriteMem(
+                self.FLASH_ARRAY_BASE + address, len(data), to_c_buffer(data)
+            )
         bytes_flashed = self.link.jl.JLINKARM_EndDownload()
         if bytes_flashed < 0:
             logging.error(
-                "Download failed with code: @{:x} {}".format(
-                    self.FLASH_ARRAY_BASE, bytes_flashed
-                )
+                "Download failed with code: @%x %s",
+                self.FLASH_ARRAY_BASE,
+                bytes_flashed,
             )
             sys.exit(bytes_flashed)
         return 1
@@ -1330,23 +1474,21 @@ class da1469x(da1468x_da1469x_da1470x):
         `DA1469x datasheet <https://www.dialog-semiconductor.com/sites/default/files/2020-12/da1469x_datasheet_3v2.pdf>`_
         Figure 13
         """
-        buff = b""
-        buff += struct.pack(">2c", b"Q", b"q")
-        buff += struct.pack("<I", len(image))
-        buff += struct.pack("<I", binascii.crc32(image))
-        buff += bytes("ezFlashCLI", "utf-8")
-        # pad the version string
-        for i in range(6):
-            buff += struct.pack("b", 0x0)
-        # add the time stamp
-        buff += struct.pack("<I", 0)
-        buff += struct.pack("<I", self.IMG_IVT_OFFSET)
-        buff += struct.pack("<H", 0x22AA)
-        buff += struct.pack("<H", 0x0)
-        buff += struct.pack("<H", 0x44AA)
-        buff += struct.pack("<H", 0x0)
-
-        return buff
+        # magic, size, crc, zero padded version string, time stamp, IVT
+        # offset, then the empty security and device admin sections
+        return struct.pack(
+            "<2sII16sII4H",
+            b"Qq",
+            len(image),
+            crc32(image),
+            b"ezFlashCLI",
+            0,
+            self.IMG_IVT_OFFSET,
+            0x22AA,
+            0x0,
+            0x44AA,
+            0x0,
+        )
 
     def scatterfile_product_header(
         self,
@@ -1368,7 +1510,7 @@ class da1469x(da1468x_da1469x_da1470x):
         flash_burstcmdb_reg_value = flash["flash_burstcmdb_reg_value"]
         flash_write_config_command = flash["flash_write_config_command"]
 
-        cmd_len = len(flash_write_config_command.split(" "))
+        cmd_len = len(parse_config_command(flash_write_config_command))
 
         headerarray = self.make_product_header(
             flash,
@@ -1444,12 +1586,12 @@ class da1469x(da1468x_da1469x_da1470x):
         outputArray = outputArray.format(
             flash_burstcmda_reg_value,
             flash_burstcmdb_reg_value,
-            len(flash_write_config_command.split(" ")),
+            cmd_len,
             self.add_flash_sequence(flash_write_config_command),
             crc,
             flash_burstcmda_reg_value,
             flash_burstcmdb_reg_value,
-            len(flash_write_config_command.split(" ")),
+            cmd_len,
             self.add_flash_sequence(flash_write_config_command),
             crc,
         )
@@ -1458,13 +1600,12 @@ class da1469x(da1468x_da1469x_da1470x):
 
     def add_flash_sequence(self, conf_seq):
         """Add flash sequence depending on the conf."""
-        data = ""
-        for databyte in conf_seq.split(" "):
-            data += "                BYTE({})                      // Flash config sequence\n".format(
+        return "".join(
+            "                BYTE({})                      // Flash config sequence\n".format(
                 databyte
             )
-
-        return data
+            for databyte in conf_seq.split()
+        )
 
     def make_product_header(
         self,
@@ -1488,40 +1629,29 @@ class da1469x(da1468x_da1469x_da1470x):
         flash_burstcmdb_reg_value = flash["flash_burstcmdb_reg_value"]
         flash_write_config_command = flash["flash_write_config_command"]
 
-        configCommand = flash_write_config_command.split(" ")
-        buff = b""
-        buff += struct.pack(">2c", b"P", b"p")
-        buff += struct.pack(
-            "<2I", int(active_fw_image_address), int(update_fw_image_address)
-        )
-        buff += struct.pack(
-            "<2I",
-            int(flash_burstcmda_reg_value[2:], 16),
-            int(flash_burstcmdb_reg_value[2:], 16),
+        configCommand = parse_config_command(flash_write_config_command)
+        buff = (
+            struct.pack(
+                "<2s4I2H",
+                b"Pp",
+                int(active_fw_image_address),
+                int(update_fw_image_address),
+                int(flash_burstcmda_reg_value[2:], 16),
+                int(flash_burstcmdb_reg_value[2:], 16),
+                0x11AA,
+                len(configCommand),
+            )
+            + configCommand
         )
-        buff += struct.pack(">H", 0xAA11)
-        if configCommand[0] != "":
-            buff += struct.pack("H", len(configCommand))
-            for cmd in configCommand:
-                buff += struct.pack("<B", int(cmd, 16))
-        else:
-            buff += struct.pack("<H", 0x00)
         buff += struct.pack("<H", binascii.crc_hqx(buff, 0xFFFF))
-        buff += b"\xFF" * (self.PRODUCT_HEADER_SIZE - len(buff))
-        return buff
+        return buff.ljust(self.PRODUCT_HEADER_SIZE, b"\xFF")
 
     def read_product_header(self):
         """Read the product header."""
-        dataArray = self.link.rd_mem(
-            8, self.FLASH_READ_ARRAY_BASE, self.PRODUCT_HEADER_SIZE
+        return self.link.rd_mem_bytes(
+            self.FLASH_READ_ARRAY_BASE, self.PRODUCT_HEADER_SIZE
         )
 
-        product_header = b""
-        for data in dataArray:
-            product_header += struct.pack("<B", data)
-
-        return product_header
-
     def check_address(self, address):
         """Check if an address is within the parameters for the cache.
 
@@ -1541,19 +1671,18 @@ class da1469x(da1468x_da1469x_da1470x):
             fileData: Byte array
             flashid: tuple extracted from the flash database
         """
+        device = self.link.Device.decode("utf-8")
         if fileData[:2] == b"Pp":
-            logging.info("[" + self.link.Device.decode("utf-8") + "] Program image")
+            logging.info("[%s] Program image", device)
             self.flash_program_data(fileData, 0x0)
         else:
             if fileData[:2] != b"Qq":
-                logging.info(
-                    "[" + self.link.Device.decode("utf-8") + "] Add image header"
-                )
+                logging.info("[%s] Add image header", device)
                 ih = self.make_image_header(fileData)
-                ih += b"\xFF" * (self.DEFAULT_IMAGE_OFFSET - len(ih))
+                ih = ih.ljust(self.DEFAULT_IMAGE_OFFSET, b"\xFF")
                 fileData = ih + fileData
 
-            logging.info("[" + self.link.Device.decode("utf-8") + "] Program bin")
+            logging.info("[%s] Program bin", device)
             active_fw_image_address = self.DEFAULT_IMAGE_ADDRESS
             if parameters["active_fw_image_address"] is not None:
                 if not self.check_address(parameters["active_fw_image_address"]):
@@ -1564,30 +1693,23 @@ class da1469x(da1468x_da1469x_da1470x):
                 active_fw_image_address = parameters["active_fw_image_address"]
             update_fw_image_address = active_fw_image_address
             logging.debug(
-                "["
-                + self.link.Device.decode("utf-8")
-                + "] active_fw_image_address "
-                + str(active_fw_image_address)
+                "[%s] active_fw_image_address %s", device, active_fw_image_address
             )
             logging.debug(
-                "["
-                + self.link.Device.decode("utf-8")
-                + "] update_fw_image_address "
-                + str(update_fw_image_address)
+                "[%s] update_fw_image_address %s", device, update_fw_image_address
             )
             self.flash_program_data(fileData, active_fw_image_address)
 
-            logging.info(
-                "[" + self.link.Device.decode("utf-8") + "] Program product header"
-            )
+            logging.info("[%s] Program product header", device)
             ph = self.make_product_header(
                 parameters["flashid"],
                 active_fw_image_address=active_fw_image_address,
                 update_fw_image_address=update_fw_image_address,
             )
-            self.flash_program_data(ph, 0x0)
-            self.flash_program_data(ph, 0x1000)
-        logging.info("[" + self.link.Device.decode("utf-8") + "] Program success")
+            # the image is complete before any header points to it, the
+            # header and its backup copy then share a single download
+            self.flash_program_segments([(ph, 0x0), (ph, 0x1000)])
+        logging.info("[%s] Program success", device)
         return 1
 
     def otp_init(self):
@@ -1611,22 +1733,25 @@ class da1469x(da1468x_da1469x_da1470x):
             self.link.wr_mem(32, self.OTPC_MODE_REG, mode)
 
         # Wait for mode change
-        while (self.link.rd_mem(32, self.OTPC_STAT_REG, 1)[0] & 0x4) == 0:
-            pass
+        self.poll_register(32, self.OTPC_STAT_REG, 0x4, 0x4)
 
     def otp_verify_words(self, words, offset, mode):
         """Verify OTP words."""
         # Verify words
         self.otp_set_mode(mode)
-        for word in words:
-            read = self.link.rd_mem(
-                self.OTP_CFG_SCRIPT_ENTRY_SIZE * 8, self.OTP_CFG_SCRIPT_ADDR + offset, 1
-            )[0]
+        read_words = self.link.rd_mem(
+            self.OTP_CFG_SCRIPT_ENTRY_SIZE * 8,
+            self.OTP_CFG_SCRIPT_ADDR + offset,
+            len(words),
+        )
+        for read, word in zip(read_words, words):
             if read != word:
                 logging.error(
-                    "OTP verify fail: mode {}, offset 0x{:x}, read 0x{:x}, written 0x{:x}".format(
-                        mode, offset, read, word
-                    )
+                    "OTP verify fail: mode %s, offset 0x%x, read 0x%x, written 0x%x",
+                    mode,
+                    offset,
+                    read,
+                    word,
                 )
                 return False
             offset += self.OTP_CFG_SCRIPT_ENTRY_SIZE
@@ -1644,13 +1769,11 @@ class da1469x(da1468x_da1469x_da1470x):
         for word in words:
             self.link.wr_mem(32, self.OTPC_PWORD_REG, word)
             self.link.wr_mem(32, self.OTPC_PADDR_REG, cell_offset)
-            while (self.link.rd_mem(32, self.OTPC_STAT_REG, 1)[0] & 0x2) == 0:
-                pass
+            self.poll_register(32, self.OTPC_STAT_REG, 0x2, 0x2)
             cell_offset += 1
 
         # Wait for programming
-        while (self.link.rd_mem(32, self.OTPC_STAT_REG, 1)[0] & 0x1) == 0:
-            pass
+        self.poll_register(32, self.OTPC_STAT_REG, 0x1, 0x1)
 
         # Verify
         if not self.otp_verify_words(words, offset, self.OTPC_MODE_PVFY):
@@ -1682,6 +1805,7 @@ class da1469x(da1468x_da1469x_da1470x):
         )
 
         # Parse entries skipping start entry
+        debug = logging.getLogger().isEnabledFor(logging.DEBUG)
         count = 0
         index = 1
         while index < self.OTP_CFG_SCRIPT_ENTRY_CNT_MAX:
@@ -1691,9 +1815,9 @@ class da1469x(da1468x_da1469x_da1470x):
             if entry == key:
                 if key != 0xFFFFFFFF:
                     logging.info(
-                        "OTP key found at offset 0x{:x} with value 0x{:x}".format(
-                            index * self.OTP_CFG_SCRIPT_ENTRY_SIZE, entries[index + 1]
-                        )
+                        "OTP key found at offset 0x%x with value 0x%x",
+                        index * self.OTP_CFG_SCRIPT_ENTRY_SIZE,
+                        entries[index + 1],
                     )
                 count += 1
 
@@ -1702,9 +1826,7 @@ class da1469x(da1468x_da1469x_da1470x):
                 if count == 0:
                     logging.info("OTP key not yet in script")
                 logging.info(
-                    "OTP write offset: 0x{:x}".format(
-                        index * self.OTP_CFG_SCRIPT_ENTRY_SIZE
-                    )
+                    "OTP write offset: 0x%x", index * self.OTP_CFG_SCRIPT_ENTRY_SIZE
                 )
                 return count, (index * self.OTP_CFG_SCRIPT_ENTRY_SIZE)
 
@@ -1713,15 +1835,12 @@ class da1469x(da1468x_da1469x_da1470x):
                 logging.info("OTP is locked")
                 return count, -2
 
-            logging.debug("OTP {}: {:x}".format(index, entry))
+            if debug:
+                logging.debug("OTP %s: %x", index, entry)
 
             # Decode entry and skip data values
             msb = (entry & 0xF0000000) >> 24
-            if msb == 0x60:  # BOOTER
-                index += 1
-            elif msb == 0x70:  # SWD MODE
-                index += 1
-            elif msb == 0x80:  # UART STX
+            if msb in (0x60, 0x70, 0x80):  # BOOTER, SWD MODE, UART STX
                 index += 1
             elif msb == 0x90:  # SDK ENTRIES
                 index += 1
@@ -1758,7 +1877,7 @@ class da1469x(da1468x_da1469x_da1470x):
             return 0
 
         # Write key with values
-        logging.info("OTP write key 0x{:x} with values: {}".format(key, values))
+        logging.info("OTP write key 0x%x with values: %s", key, values)
         data = [key] + values
         if not self.otp_write_words(data, offset):
             logging.error("OTP write error")
@@ -1807,25 +1926,23 @@ class da1470x(da1469x):
         flash_write_config_command = flash["flash_write_config_command"]
         flash_ctrlmode_reg_value = flash["flash_ctrlmode_reg_value"]
 
-        configCommand = flash_write_config_command.split(" ")
-        buff = b""
-        buff += struct.pack(">2c", b"P", b"p")
-        buff += struct.pack(
-            "<2I", int(active_fw_image_address), int(update_fw_image_address)
-        )
-        buff += struct.pack(
-            "<3I",
-            int(flash_burstcmda_reg_value[2:], 16),
-            int(flash_burstcmdb_reg_value[2:], 16),
-            int(flash_ctrlmode_reg_value[2:], 16),
+        configCommand = parse_config_command(flash_write_config_command)
+        buff = (
+            struct.pack(
+                "<2s5I2H",
+                b"Pp",
+                int(active_fw_image_address),
+                int(update_fw_image_address),
+                int(flash_burstcmda_reg_value[2:], 16),
+                int(flash_burstcmdb_reg_value[2:], 16),
+                int(flash_ctrlmode_reg_value[2:], 16),
+                0x11AA,
+                len(configCommand),
+            )
+            + configCommand
         )
-        buff += struct.pack(">H", 0xAA11)
-        buff += struct.pack("H", len(configCommand))
-        for cmd in configCommand:
-            buff += struct.pack("<B", int(cmd, 16))
         buff += struct.pack("<H", binascii.crc_hqx(buff, 0xFFFF))
-        buff += b"\xFF" * (self.PRODUCT_HEADER_SIZE - len(buff))
-        return buff
+        return buff.ljust(self.PRODUCT_HEADER_SIZE, b"\xFF")
 
     def flash_hw_qspi_cs_enable(self):
         """Enable QSPI CS.
@@ -1961,12 +2078,13 @@ class da14592(da1469x):
         Figure 13
 
         """
-        buff = b""
-        buff += struct.pack("I", 0xA5A5A5A5)
-        buff += struct.pack("<I", int(0x60000000 | prod_header_addr))
-        buff += struct.pack("<I", self.CACHE_EFLASH_REG)
-        buff += struct.pack("<I", self.CACHE_EFLASH_REG_val)
-        return buff
+        return struct.pack(
+            "<4I",
+            0xA5A5A5A5,
+            int(0x60000000 | prod_header_addr),
+            self.CACHE_EFLASH_REG,
+            self.CACHE_EFLASH_REG_val,
+        )
 
     def flash_program_image(self, fileData, parameters):
         """Program and image in the flash.
@@ -1984,7 +2102,7 @@ class da14592(da1469x):
             if fileData[:2] != b"Qq":
                 logging.info("[DA14592] Add image header")
                 ih = self.make_image_header(fileData)
-                ih += b"\xFF" * (_592_DEFAULT_IMAGE_OFFSET - len(ih))
+                ih = ih.ljust(_592_DEFAULT_IMAGE_OFFSET, b"\xFF")
                 fileData = ih + fileData
 
             active_fw_image_address = _592_DEFAULT_IMAGE_ADDRESS
@@ -1998,10 +2116,10 @@ class da14592(da1469x):
             update_fw_image_address = active_fw_image_address
             logging.info("[DA14592] Program bin to 0x%X", active_fw_image_address)
             logging.debug(
-                "[DA14592] active_fw_image_address " + str(active_fw_image_address)
+                "[DA14592] active_fw_image_address %s", active_fw_image_address
             )
             logging.debug(
-                "[DA14592] update_fw_image_address " + str(update_fw_image_address)
+                "[DA14592] update_fw_image_address %s", update_fw_image_address
             )
             self.flash_program_data(fileData, active_fw_image_address)
 
@@ -2013,15 +2131,10 @@ class da14592(da1469x):
                 update_fw_image_address=update_fw_image_address,
             )
             cs = self.make_config_script()
-            print(hex(len(cs)))
-            cs += b"\xFF" * (0x1000 - len(cs))
-            print(hex(len(cs)))
+            cs = cs.ljust(0x1000, b"\xFF")
             cs += ph
-            print(hex(len(cs)))
-            cs += b"\xFF" * (0x1800 - len(cs))
-            print(hex(len(cs)))
+            cs = cs.ljust(0x1800, b"\xFF")
             cs += ph
-            print(hex(len(cs)))
             logging.info("[DA14592] Program cs script and product headers")
             self.flash_program_data(cs, 0x0)
         logging.info("[DA14592] Program success")
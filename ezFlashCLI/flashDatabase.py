@@ -0,0 +1,89 @@
+"""Flash devices database loader."""
+
+# The MIT License (MIT)
+# Copyright (c) 2019 ezflash
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+# DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+# OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+# OR OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import os
+import pickle
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+FLASH_DATABASE_PATH = os.path.join(_PACKAGE_DIR, "flash_database.json")
+FLASH_DATABASE_CACHE_PATH = os.path.join(_PACKAGE_DIR, "flash_database.pkl")
+# protocol supported by all the python versions able to run the package
+FLASH_DATABASE_CACHE_PROTOCOL = 4
+
+
+def read_flash_database_json():
+    """Parse the json flash database.
+
+    orjson is used when installed, the standard json module otherwise.
+
+    Returns:
+        The flash database dictionary
+    """
+    if orjson is not None:
+        with open(FLASH_DATABASE_PATH, "rb") as json_file:
+            return orjson.loads(json_file.read())
+
+    with open(FLASH_DATABASE_PATH) as json_file:
+        return json.load(json_file)
+
+
+def build_flash_database_cache(path=FLASH_DATABASE_CACHE_PATH):
+    """Parse the json flash database and store it as a pickle cache.
+
+    This is done at build time only, the package directory is never written
+    at runtime.
+
+    Args:
+        path: destination file, the build output copy of flash_database.pkl
+
+    Returns:
+        The flash database dictionary
+    """
+    flash_db = read_flash_database_json()
+
+    with open(path, "wb") as cache_file:
+        pickle.dump(flash_db, cache_file, protocol=FLASH_DATABASE_CACHE_PROTOCOL)
+
+    return flash_db
+
+
+def load_flash_database():
+    """Load the flash database.
+
+    The pickle cache generated at build time is used when available,
+    otherwise the json database is parsed.
+
+    Returns:
+        The flash database dictionary
+    """
+    try:
+        with open(FLASH_DATABASE_CACHE_PATH, "rb") as cache_file:
+            return pickle.load(cache_file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return read_flash_database_json()
@@ -23,6 +23,7 @@
 import argparse
 import logging
 import sys
+import threading
 
 import serial
 
@@ -30,6 +31,25 @@ from ezFlashCLI.cli import __version__
 
 BAUDRATE = 115200
 TIMEOUT = 5
+ECHO_CHUNK_SIZE = 1024
+
+
+def xor_checksum(data):
+    """Return the XOR of all the bytes of data, as checked by the booter.
+
+    The data is folded in halves as a single integer, which keeps the work
+    in C instead of looping over the bytes in Python.
+
+    Args:
+        data: bytes-like object
+    """
+    value = int.from_bytes(data, "little")
+    length = len(data)
+    while length > 1:
+        half = length // 2
+        value = (value & ((1 << (8 * half)) - 1)) ^ (value >> (8 * half))
+        length -= half
+    return value
 
 
 class da1469xSerialLoader(object):
@@ -44,7 +64,7 @@ class da1469xSerialLoader(object):
         self.argument_parser()
 
         if self.args.version:
-            self.logger.info("{}".format(__version__))
+            self.logger.info("%s", __version__)
             sys.exit(0)
 
         if not self.args.port:
@@ -78,14 +98,12 @@ class da1469xSerialLoader(object):
                 data = fp.read()
                 size = len(data)
         except Exception as ex:
-            self.logger.error("Failed to read application. Err: {}".format(ex))
+            self.logger.error("Failed to read application. Err: %s", ex)
             return 1
 
-        self.logger.debug("Loading App size {}".format(size))
+        self.logger.debug("Loading App size %s", size)
 
-        crc = 0
-        for d in data:
-            crc ^= d
+        crc = xor_checksum(data)
 
         if not self.get_stx():
             self.logger.debug("Press Reset")
@@ -106,34 +124,56 @@ class da1469xSerialLoader(object):
             self.logger.error("Failed to get length ACK")
             return
 
-        chunkSize = 1024
         if self.one_wire:
-            while len(data):
-                if len(data) >= chunkSize:
-                    self.sp.write(data[:chunkSize])
-                    self.sp.read(chunkSize)
-                    data = data[chunkSize:]
-                else:
-                    self.sp.write(data)
-                    self.sp.read(len(data))
-                    data = []
+            # the echo is drained by a second thread so the transmit side
+            # never waits for it
+            reader = threading.Thread(target=self.drain_echo, args=(size,))
+            reader.start()
+            self.sp.write(data)
+            reader.join()
+            # leftover echo bytes would be taken for the CRC
+            if self.echo_error is not None:
+                self.logger.error("Failed to read the echo: %s", self.echo_error)
+                return
+            if self.echo_drained != size:
+                self.logger.error(
+                    "Echo incomplete, %s of %s bytes received", self.echo_drained, size
+                )
+                return
         else:
             self.sp.write(data)
 
         read_crc = int.from_bytes(self.sp.read(1), byteorder="little")
         if read_crc != crc:
-            self.logger.debug("Failed to get data ACK {} {}".format(read_crc, crc))
+            self.logger.debug("Failed to get data ACK %s %s", read_crc, crc)
             return
 
         self.sp.write(b"\x06")
         self.logger.info("Loading success")
 
+    def drain_echo(self, length):
+        """Consume the echo of the bytes sent on a one wire UART.
+
+        The number of bytes consumed is stored in echo_drained and a serial
+        port error in echo_error, to be checked once the thread is joined.
+
+        Args:
+            length: number of echoed bytes to read
+        """
+        self.echo_drained = 0
+        self.echo_error = None
+        try:
+            while self.echo_drained < length:
+                echo = self.sp.read(min(length - self.echo_drained, ECHO_CHUNK_SIZE))
+                if not echo:
+                    return
+                self.echo_drained += len(echo)
+        except Exception as ex:
+            self.echo_error = ex
+
     def get_stx(self):
         """Capture the STX character from the smarbond."""
-        if self.sp.read(1) == b"\x02":
-            return True
-
-        return False
+        return self.sp.read(1) == b"\x02"
 
     def argument_parser(self):
         """Initialize the arguments passed from the command line."""
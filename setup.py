@@ -25,8 +25,10 @@ import os
 import re
 
 from setuptools import find_packages, setup
+from setuptools.command.build_py import build_py
 
 import ezFlashCLI
+from ezFlashCLI.flashDatabase import build_flash_database_cache
 
 version = ezFlashCLI.get_version_from_git()
 
@@ -44,6 +46,25 @@ elif relStatus in "test":
 print("Building ezFlashCLI version", version)
 
 
+class ezflash_build_py(build_py):
+    """Add the generated files to the build output."""
+
+    def run(self):
+        """Build the package, then store the version and the database cache.
+
+        The generated files are only written in the build directory, a source
+        checkout keeps resolving its version from git and parsing the json
+        flash database.
+        """
+        build_py.run(self)
+        if not self.dry_run:
+            package_dir = os.path.join(self.build_lib, "ezFlashCLI")
+            ezFlashCLI.write_version_file(
+                version, os.path.join(package_dir, "version.txt")
+            )
+            build_flash_database_cache(os.path.join(package_dir, "flash_database.pkl"))
+
+
 with open("README.md") as readme_file:
     readme = readme_file.read()
 
@@ -97,4 +118,5 @@ setup(
         ],
     },
     tests_require=test_requirements,
+    cmdclass={"build_py": ezflash_build_py},
 )